@@ -0,0 +1,182 @@
+"""
+Benchmarks hors ligne du compteur de cartes (aucune connexion Telegram).
+
+Génère des messages réalistes au format des exemples du README
+(`#N1392. ✅6(6♠️5♥️5♣️) - 4(8♥️7♣️9♦️) #T10`) et mesure, pour 1k, 10k et 100k jeux :
+- CardCounter.add       : latence par appel (percentiles) et débit
+- build_report          : latence par appel (échantillonnée pendant l'ingestion)
+- report_and_reset      : latence du bilan horaire complet
+- mémoire               : pic d'allocation (tracemalloc) pendant l'ingestion, octets par jeu
+                          (moyenne et coût marginal sur la seconde moitié des jeux)
+
+Avec --check, le coût marginal par jeu doit rester sous MAX_BYTES_PER_GAME (sinon code de
+sortie 1).
+
+Usage : python benchmark.py [--sizes 1000 10000 100000] [--seed 1] [--output bench_output.txt] [--check]
+"""
+import argparse
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Tuple
+
+from card_counter import CardCounter
+
+RANKS = ["A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K"]
+SUITS = ["♠️", "♥️", "♦️", "♣️"]
+DEFAULT_SIZES = [1000, 10000, 100000]
+BASELINE_BYTES_PER_GAME = 54.3  # Avant le stockage en colonnes, 100k jeux
+MAX_BYTES_PER_GAME = 27.0       # Au moins deux fois moins que la référence
+
+
+def card_value(rank: str) -> int:
+    return int(rank) % 10 if rank.isdigit() else (1 if rank == "A" else 0)
+
+
+def generate_messages(count: int, seed: int = 1, start: int = 1) -> List[str]:
+    """Messages finalisés cohérents (points = somme des cartes modulo 10)."""
+    rnd = random.Random(seed)
+    messages = []
+    for i in range(count):
+        hands = [
+            [(rnd.choice(RANKS), rnd.choice(SUITS)) for _ in range(rnd.choice((2, 3)))]
+            for _ in range(2)
+        ]
+        points = [sum(card_value(rank) for rank, _ in hand) % 10 for hand in hands]
+        cards = ["".join(rank + suit for rank, suit in hand) for hand in hands]
+        if points[0] > points[1]:
+            marks = ("✅", "")
+        elif points[1] > points[0]:
+            marks = ("", "✅")
+        else:
+            marks = ("🔰", "")
+        t_number = points[0] + points[1] + rnd.randint(0, 9)
+        messages.append(
+            f"#N{start + i}. {marks[0]}{points[0]}({cards[0]}) - {marks[1]}{points[1]}({cards[1]}) #T{t_number}"
+        )
+    return messages
+
+
+def percentiles(samples_ns: List[int]) -> Dict[str, float]:
+    """p50/p95/p99/max en microsecondes."""
+    if not samples_ns:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(samples_ns)
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] / 1000
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "max": ordered[-1] / 1000}
+
+
+def bench_add(messages: List[str]) -> Dict[str, float]:
+    counter = CardCounter()
+    samples = []
+    clock = time.perf_counter_ns
+    start = clock()
+    for text in messages:
+        t0 = clock()
+        counter.add(text)
+        samples.append(clock() - t0)
+    elapsed = (clock() - start) / 1e9
+    result = percentiles(samples)
+    result["throughput"] = len(messages) / elapsed if elapsed else 0.0
+    return result
+
+
+def bench_build_report(messages: List[str], report_samples: int) -> Dict[str, float]:
+    """Ingestion avec build_report échantillonné (comme l'envoi instantané de process_finalized_message)."""
+    counter = CardCounter()
+    every = max(1, len(messages) // report_samples)
+    samples = []
+    clock = time.perf_counter_ns
+    for i, text in enumerate(messages, 1):
+        counter.add(text)
+        if i % every == 0:
+            t0 = clock()
+            counter.build_report()
+            samples.append(clock() - t0)
+    result = percentiles(samples)
+    result["calls"] = len(samples)
+    return result
+
+
+def bench_report_and_reset(messages: List[str], repeat: int) -> Dict[str, float]:
+    samples = []
+    clock = time.perf_counter_ns
+    for _ in range(repeat):
+        counter = CardCounter()
+        for text in messages:
+            counter.add(text)
+        t0 = clock()
+        counter.report_and_reset()
+        samples.append(clock() - t0)
+    return percentiles(samples)
+
+
+def bench_memory(messages: List[str]) -> Dict[str, float]:
+    gc.collect()
+    tracemalloc.start()
+    counter = CardCounter()
+    half = len(messages) // 2
+    for text in messages[:half]:
+        counter.add(text)
+    halfway, _ = tracemalloc.get_traced_memory()
+    for text in messages[half:]:
+        counter.add(text)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Le coût marginal écarte les allocations fixes (tables, tampons zlib), qui dominent sur peu de jeux
+    return {"current_kib": current / 1024, "peak_kib": peak / 1024, "bytes_per_game": current / len(messages),
+            "marginal_bytes_per_game": (current - halfway) / max(1, len(messages) - half)}
+
+
+def run(sizes: List[int], seed: int, report_samples: int) -> Tuple[List[str], float]:
+    """Lignes de résultats et coût marginal par jeu mesuré sur la plus grande taille."""
+    lines = []
+    marginal = 0.0
+    for size in sizes:
+        messages = generate_messages(size, seed)
+        add = bench_add(messages)
+        report = bench_build_report(messages, report_samples)
+        full = bench_report_and_reset(messages, repeat=3 if size <= 10000 else 1)
+        memory = bench_memory(messages)
+        lines += [
+            f"=== {size} jeux ===",
+            f"add              : p50 {add['p50']:.1f} µs | p95 {add['p95']:.1f} µs | p99 {add['p99']:.1f} µs"
+            f" | max {add['max']:.1f} µs | {add['throughput']:.0f} msg/s",
+            f"build_report     : p50 {report['p50']:.1f} µs | p95 {report['p95']:.1f} µs | p99 {report['p99']:.1f} µs"
+            f" | max {report['max']:.1f} µs | {report['calls']:.0f} appels",
+            f"report_and_reset : p50 {full['p50'] / 1000:.2f} ms | max {full['max'] / 1000:.2f} ms",
+            f"mémoire          : pic {memory['peak_kib']:.0f} KiB | résident {memory['current_kib']:.0f} KiB"
+            f" | {memory['bytes_per_game']:.1f} octets/jeu | marginal {memory['marginal_bytes_per_game']:.1f}"
+            f" octets/jeu (référence {BASELINE_BYTES_PER_GAME} octets/jeu)",
+            "",
+        ]
+        print("\n".join(lines[-6:]))
+        marginal = memory["marginal_bytes_per_game"]
+    return lines, marginal
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks hors ligne de CardCounter")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--report-samples", type=int, default=200,
+                        help="nombre d'appels build_report mesurés par taille")
+    parser.add_argument("--output", help="fichier où écrire les résultats (ex: bench_output.txt)")
+    parser.add_argument("--check", action="store_true",
+                        help=f"échoue si le coût marginal dépasse {MAX_BYTES_PER_GAME} octets/jeu")
+    args = parser.parse_args()
+
+    lines, marginal = run(args.sizes, args.seed, args.report_samples)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+    if args.check and marginal > MAX_BYTES_PER_GAME:
+        print(f"❌ {marginal:.1f} octets/jeu > {MAX_BYTES_PER_GAME} (référence {BASELINE_BYTES_PER_GAME})")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Archive des bilans horaires: chaque état détaché par le bilan (heure écoulée) est
+ajouté en fin de fichier sous forme d'un enregistrement binaire de taille fixe
+(début, fin, nombre de jeux, compteurs). Les enregistrements sont dans l'ordre des
+dates de fin, ce qui sert d'index temporel: une requête sur une plage cherche les
+bornes par dichotomie dans le fichier projeté en mémoire (mmap) et n'additionne que
+les heures concernées, sans charger tout l'historique.
+"""
+import mmap
+import struct
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from card_counter import CardCounter, CATEGORIES, KEY_LABELS, RANKS, REJECT_REASONS, SUIT_LABELS
+from persistence import writer
+
+SIDES = ("joueur", "banquier")
+
+# Champs des compteurs, dans l'ordre de l'enregistrement: (groupe, clé)
+FIELDS: Tuple[Tuple[str, str], ...] = (
+    (("games", "total"),)
+    + tuple((name, key) for name, keys in CATEGORIES.items() for key in keys)
+    + tuple((f"suits.{side}", suit) for side in SIDES for suit in SUIT_LABELS)
+    + tuple((f"ranks.{side}", rank) for side in SIDES for rank in RANKS)
+    + tuple(("rejected", reason) for reason in REJECT_REASONS)
+)
+_RECORD = struct.Struct(f"<qq{len(FIELDS)}I")  # Début et fin (secondes epoch), puis compteurs
+_END = struct.Struct("<q")
+_END_OFFSET = 8
+
+
+class BilanArchive:
+    def __init__(self, file_path: str = "data/bilan_archive.bin"):
+        self.file_path = Path(file_path)
+        self._last_end: Optional[int] = None
+
+    # ---------- ÉCRITURE ----------
+    @staticmethod
+    def _values(counter: CardCounter) -> List[int]:
+        counts = counter.get_counts()
+        suits, ranks = counter.get_suit_counts(), counter.get_rank_counts()
+        rejected = counter.get_rejected_counts()
+        values = [counter.get_game_count()]
+        values += [counts[name][key] for name, keys in CATEGORIES.items() for key in keys]
+        values += [suits[side][suit] for side in SIDES for suit in SUIT_LABELS]
+        values += [ranks[side][rank] for side in SIDES for rank in RANKS]
+        values += [rejected[reason] for reason in REJECT_REASONS]
+        return values
+
+    def append(self, counter: CardCounter, start: float, end: float):
+        """Ajoute l'état (figé) d'une heure écoulée à l'archive."""
+        last_end = self.last_end()
+        # L'ordre des dates de fin est l'index: une horloge qui recule ne doit pas le casser
+        end = int(end) if last_end is None else max(int(end), last_end)
+        writer.append_bytes(self.file_path, _RECORD.pack(int(start), end, *self._values(counter)))
+        self._last_end = end
+
+    def last_end(self) -> Optional[int]:
+        """Date de fin (secondes epoch) du dernier enregistrement, None si l'archive est vide."""
+        if self._last_end is None:
+            # Premier appel, avant tout ajout de ce processus: seul le dernier enregistrement complet est lu
+            try:
+                with open(self.file_path, "rb") as f:
+                    size = (f.seek(0, 2) // _RECORD.size) * _RECORD.size
+                    if size:
+                        f.seek(size - _RECORD.size + _END_OFFSET)
+                        self._last_end = _END.unpack(f.read(_END.size))[0]
+            except FileNotFoundError:
+                pass
+        return self._last_end
+
+    # ---------- LECTURE ----------
+    @staticmethod
+    def _bisect(buffer, count: int, timestamp: int) -> int:
+        """Premier enregistrement dont la date de fin est > timestamp."""
+        low, high = 0, count
+        while low < high:
+            mid = (low + high) // 2
+            if _END.unpack_from(buffer, mid * _RECORD.size + _END_OFFSET)[0] <= timestamp:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def query(self, start: float, end: float) -> Dict[str, Any]:
+        """
+        Agrège les heures dont la date de fin est dans ]start, end].
+        Résultat: {"hours", "start", "end", "games", "pair": {...}, "winner": {...},
+        "parity": {...}, "suits.joueur": {...}, ..., "rejected": {...}}.
+        """
+        totals = [0] * len(FIELDS)
+        hours, first, last = 0, None, None
+        try:
+            f = open(self.file_path, "rb")
+        except FileNotFoundError:
+            f = None
+        if f is not None:
+            with f:
+                size = (f.seek(0, 2) // _RECORD.size) * _RECORD.size
+                if size:
+                    with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as buffer:
+                        count = size // _RECORD.size
+                        lo = self._bisect(buffer, count, int(start))
+                        hi = self._bisect(buffer, count, int(end))
+                        for record_start, record_end, *values in _RECORD.iter_unpack(
+                                buffer[lo * _RECORD.size:hi * _RECORD.size]):
+                            first = record_start if first is None else first
+                            last = record_end
+                            hours += 1
+                            for i, value in enumerate(values):
+                                totals[i] += value
+        result: Dict[str, Any] = {"hours": hours, "start": first, "end": last, "games": totals[0]}
+        for (group, key), value in zip(FIELDS[1:], totals[1:]):
+            result.setdefault(group, {})[key] = value
+        return result
+
+    def query_last_hours(self, hours: int) -> Dict[str, Any]:
+        now = time.time()
+        return self.query(now - hours * 3600, now)
+
+
+def format_summary(result: Dict[str, Any]) -> str:
+    """Texte Telegram d'un résultat de query."""
+    if not result["hours"]:
+        return "📚 Aucun bilan archivé sur cette période."
+    fmt = "%d/%m %Hh%M"
+    lines = [
+        "📚 **ARCHIVE DES BILANS**",
+        f"🕐 {time.strftime(fmt, time.localtime(result['start']))} → {time.strftime(fmt, time.localtime(result['end']))}"
+        f" ({result['hours']} bilans)",
+        f"🎮 Jeux : {result['games']}",
+        "─────────────────────────────────",
+    ]
+    for name, keys in CATEGORIES.items():
+        total = sum(result[name].values())
+        for key in keys:
+            count = result[name][key]
+            pct = count * 100 / total if total else 0
+            lines.append(f"{KEY_LABELS[key]} : {count:4d} ({pct:6.2f}%)")
+        lines.append("")
+    rejected = sum(result["rejected"].values())
+    if rejected:
+        lines.append(f"🚫 Rejetés : {rejected}")
+    return "\n".join(lines).strip()
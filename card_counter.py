@@ -1,54 +1,776 @@
+import os
 import re
-from typing import Dict, List, Tuple, Optional, Any
+import heapq
+import logging
+import struct
+import sys
+import uuid
+import zlib
+from array import array
+from operator import add, itemgetter
+from typing import Dict, List, Tuple, Optional, Any, NamedTuple, Iterator, Sequence, Iterable
+
+try:
+    import numpy as np
+except ImportError:  # NumPy est optionnel: seules les exportations en tableaux en dépendent
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Regex compilées une seule fois (format: #N1392. ✅6(6♠️5♥️5♣️) - 4(8♥️7♣️9♦️) #T10)
+_GAME_RE = re.compile(
+    r'#N(?P<number>\d+)\.\s*(?P<mark1>[✅🔰]?)(?P<pg1>\d+)\((?P<group1>[^)]*)\)'
+    r'\s*-\s*(?P<mark2>[✅🔰]?)(?P<pg2>\d+)\((?P<group2>[^)]*)\)'
+)
+_GROUPS_RE = re.compile(r"\(([^)]*)\)")
+_GAME_NUMBER_RE = re.compile(r'#N(\d+)')
+_T_NUMBER_RE = re.compile(r'#T(\d+)')
+_POINTS_RE = re.compile(r'#N\d+\.\s*(\d+)\([^)]*\)\s*-\s*[✅🔰]?(\d+)\(')
+_JOUEUR_RE = re.compile(r'#N\d+\.\s*✅\d+\(')
+_BANQUIER_RE = re.compile(r'-\s*✅\d+\(')
+_SYMBOL_RE = re.compile(r'[♠♥♦♣]️?')
+_SUITS = "♠♥♦♣"
+_CARD_RE = re.compile(r'(10|[2-9AJQK])([♠♥♦♣])')
+
+# Cartes encodées sur un octet: rang × 4 + couleur (NO_CODE si absente)
+RANKS = ("A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K")
+SUIT_LABELS = ("♠️", "♥️", "♦️", "♣️")
+_RANK_CODES = {rank: code for code, rank in enumerate(RANKS)}
+CARDS_PER_SIDE = 3
+# Valeur baccara de chaque code de carte (A=1, 2-9, 10/J/Q/K=0); 0 pour NO_CODE
+_CARD_POINTS = bytes(
+    (min(code // 4 + 1, 10) % 10 if code < len(RANKS) * 4 else 0) for code in range(256)
+)
+# Motifs de rejet des messages incohérents
+REJECT_REASONS = ("cartes", "points")
+
+# Catégories stockées sous forme de petits codes entiers (un octet par jeu)
+PAIR_KEYS = ("2/2", "2/3", "3/2", "3/3")
+WINNER_KEYS = ("joueur", "banquier", "nul")
+PARITY_KEYS = ("odd", "even")
+CATEGORIES: Dict[str, Tuple[str, ...]] = {"pair": PAIR_KEYS, "winner": WINNER_KEYS, "parity": PARITY_KEYS}
+CATEGORY_CODES: Dict[str, Dict[str, int]] = {
+    name: {key: code for code, key in enumerate(keys)} for name, keys in CATEGORIES.items()
+}
+NO_CODE = 255  # Catégorie absente pour ce jeu
+PAIR_DISPLAY_ORDER = ("3/2", "3/3", "2/2", "2/3")
+
+# Libellés d'affichage des clés de catégorie
+KEY_LABELS = {
+    "2/2": "🎯 2/2", "2/3": "🍀 2/3", "3/2": "💪 3/2", "3/3": "🔥 3/3",
+    "joueur": "👤 Joueur", "banquier": "🏦 Banquier", "nul": "⚖️ Nul",
+    "odd": "🔴 Impair", "even": "🔵 Pair",
+}
+
+# Tailles des fenêtres glissantes "derniers N jeux"
+WINDOW_SIZES = (50, 200, 1000)
+
+# Ligne déplacée sur disque (voir GameStore.spill): numéro, codes de catégories, cartes
+_SEGMENT_ROW = struct.Struct(f"<I{len(CATEGORIES)}B{2 * CARDS_PER_SIDE}B")
+SPILL_CHECK_EVERY = 256  # Contrôle du budget mémoire tous les N jeux
+
+
+class GameRecord(NamedTuple):
+    """Résultat du parsing d'un message finalisé (lu une seule fois)."""
+    number: Optional[int]
+    group1: Optional[str]
+    group2: Optional[str]
+    count1: int
+    count2: int
+    winner: Optional[str]  # "joueur", "banquier", "nul" ou None
+    t_number: Optional[int]
+    pg1: Optional[int]
+    pg2: Optional[int]
+    cards1: Tuple[int, ...] = ()  # Codes des cartes (voir encode_card)
+    cards2: Tuple[int, ...] = ()
+
+    @property
+    def pair_key(self) -> Optional[str]:
+        """Clé de paire (ex: "2/3") si les deux groupes ont 2 ou 3 cartes."""
+        if self.count1 and self.count2:
+            return f"{self.count1}/{self.count2}"
+        return None
+
+    @property
+    def parity(self) -> Optional[str]:
+        """"even" / "odd" selon le numéro #T."""
+        if self.t_number is None:
+            return None
+        return "even" if self.t_number % 2 == 0 else "odd"
+
+
+def encode_card(rank: str, suit: str) -> int:
+    """Code d'une carte sur un octet (rang × 4 + couleur)."""
+    return _RANK_CODES[rank] * 4 + _SUITS.index(suit)
+
+
+def decode_card(code: int) -> str:
+    """Texte d'une carte (ex: "10♥️") à partir de son code."""
+    return f"{RANKS[code // 4]}{SUIT_LABELS[code % 4]}"
+
+
+def _card_codes(group: Optional[str]) -> Tuple[int, ...]:
+    """Codes des cartes d'un groupe (ex: "6♠️5♥️5♣️")."""
+    if not group:
+        return ()
+    return tuple(_RANK_CODES[rank] * 4 + _SUITS.index(suit) for rank, suit in _CARD_RE.findall(group))
+
+
+def card_frequencies(cards: array) -> Dict[str, List[List[int]]]:
+    """
+    Fréquences des couleurs et des rangs par côté (Joueur, Banquier) sur une colonne de
+    cartes (CARDS_PER_SIDE codes par côté et par jeu). Réduction NumPy si disponible.
+    """
+    if np is not None:
+        codes = np.frombuffer(cards, dtype=np.uint8).reshape(-1, 2, CARDS_PER_SIDE)
+        result: Dict[str, List[List[int]]] = {"suit": [], "rank": []}
+        for side in range(2):
+            side_codes = codes[:, side, :]
+            side_codes = side_codes[side_codes != NO_CODE].astype(np.intp)
+            result["suit"].append(np.bincount(side_codes % 4, minlength=4).tolist())
+            result["rank"].append(np.bincount(side_codes // 4, minlength=len(RANKS)).tolist())
+        return result
+    suits = [[0] * 4, [0] * 4]
+    ranks = [[0] * len(RANKS), [0] * len(RANKS)]
+    for i, code in enumerate(cards):
+        if code != NO_CODE:
+            side = (i // CARDS_PER_SIDE) % 2
+            suits[side][code % 4] += 1
+            ranks[side][code // 4] += 1
+    return {"suit": suits, "rank": ranks}
+
+
+def baccarat_points(cards: Iterable[int]) -> int:
+    """Points baccara d'une main (somme des valeurs modulo 10)."""
+    return sum(_CARD_POINTS[card] for card in cards) % 10
+
+
+def _check_cards(record: GameRecord) -> Optional[str]:
+    """Contrôle structurel: 2 ou 3 cartes reconnues de chaque côté."""
+    if not record.count1 or not record.count2:
+        return "cartes"
+    if len(record.cards1) != record.count1 or len(record.cards2) != record.count2:
+        return "cartes"
+    return None
+
+
+def validate_record(record: GameRecord) -> Optional[str]:
+    """
+    Vérifie la cohérence d'un jeu: cartes complètes et points annoncés (pg1/pg2)
+    égaux aux points calculés. Retourne le motif de rejet ou None si le jeu est valide.
+    """
+    reason = _check_cards(record)
+    if reason:
+        return reason
+    if record.pg1 is not None and baccarat_points(record.cards1) != record.pg1:
+        return "points"
+    if record.pg2 is not None and baccarat_points(record.cards2) != record.pg2:
+        return "points"
+    return None
+
+
+def validate_batch(records: Sequence[GameRecord]) -> List[Optional[str]]:
+    """
+    Version par lots de validate_record pour les rejeux d'historique: le contrôle
+    des points est vectorisé avec NumPy si disponible.
+    """
+    reasons = [_check_cards(record) for record in records]
+    cards = array('B')
+    points = array('h')
+    for record in records:
+        cards.extend(GameStore.record_cards(record))
+        points.append(-1 if record.pg1 is None else record.pg1)
+        points.append(-1 if record.pg2 is None else record.pg2)
+    if np is not None:
+        table = np.frombuffer(_CARD_POINTS, dtype=np.uint8)
+        computed = table[np.frombuffer(cards, dtype=np.uint8)].reshape(-1, 2, CARDS_PER_SIDE).sum(axis=2) % 10
+        announced = np.frombuffer(points, dtype=np.int16).reshape(-1, 2)
+        mismatch = ((announced >= 0) & (computed != announced)).any(axis=1).tolist()
+    else:
+        step = 2 * CARDS_PER_SIDE
+        mismatch = []
+        for i in range(len(records)):
+            hands = (cards[i * step:i * step + CARDS_PER_SIDE], cards[i * step + CARDS_PER_SIDE:(i + 1) * step])
+            mismatch.append(any(
+                points[2 * i + side] >= 0 and baccarat_points(hand) != points[2 * i + side]
+                for side, hand in enumerate(hands)
+            ))
+    return [reason or ("points" if bad else None) for reason, bad in zip(reasons, mismatch)]
+
+
+def _card_count(group: Optional[str]) -> int:
+    """Nombre de cartes d'un groupe (2 ou 3), 0 si invalide."""
+    if not group:
+        return 0
+    count = sum(group.count(s) for s in _SUITS)
+    return count if count in (2, 3) else 0
+
+
+def parse_game(text: str) -> GameRecord:
+    """
+    Parse un message en une seule passe et retourne un GameRecord.
+    Les messages hors format standard passent par les regex individuelles.
+    """
+    match = _GAME_RE.search(text)
+    if match:
+        group1 = match.group("group1")
+        group2 = match.group("group2")
+        if "🔰" in text:
+            winner = "nul"
+        elif match.group("mark1") == "✅":
+            winner = "joueur"
+        elif match.group("mark2") == "✅":
+            winner = "banquier"
+        else:
+            winner = None
+        t_match = _T_NUMBER_RE.search(text, match.end())
+        return GameRecord(
+            number=int(match.group("number")),
+            group1=group1,
+            group2=group2,
+            count1=_card_count(group1),
+            count2=_card_count(group2),
+            winner=winner,
+            t_number=int(t_match.group(1)) if t_match else None,
+            pg1=int(match.group("pg1")),
+            pg2=int(match.group("pg2")),
+            cards1=_card_codes(group1),
+            cards2=_card_codes(group2),
+        )
+
+    # Format non standard: repli sur les extractions séparées
+    groups = _GROUPS_RE.findall(text)
+    group1 = groups[0] if len(groups) >= 1 else None
+    group2 = groups[1] if len(groups) >= 2 else None
+    number_match = _GAME_NUMBER_RE.search(text)
+    t_match = _T_NUMBER_RE.search(text)
+    points_match = _POINTS_RE.search(text)
+    if "🔰" in text:
+        winner = "nul"
+    elif _JOUEUR_RE.search(text):
+        winner = "joueur"
+    elif _BANQUIER_RE.search(text):
+        winner = "banquier"
+    else:
+        winner = None
+    return GameRecord(
+        number=int(number_match.group(1)) if number_match else None,
+        group1=group1,
+        group2=group2,
+        count1=_card_count(group1) if group1 and group2 else 0,
+        count2=_card_count(group2) if group1 and group2 else 0,
+        winner=winner,
+        t_number=int(t_match.group(1)) if t_match else None,
+        pg1=int(points_match.group(1)) if points_match else None,
+        pg2=int(points_match.group(2)) if points_match else None,
+        cards1=_card_codes(group1),
+        cards2=_card_codes(group2),
+    )
+
+
+class GameStore:
+    """
+    Stockage colonnaire compact des jeux: une ligne par jeu avec le numéro en array('I'),
+    chaque catégorie en code d'un octet (NO_CODE si absente) et les cartes des deux côtés
+    (CARDS_PER_SIDE codes par côté). Numéro 0 = inconnu.
+    Les compteurs (catégories, couleurs et rangs par côté) sont tenus à côté des colonnes.
+    Les jeux relus en retard (voir count_late) n'entrent que dans ces compteurs, sans ligne.
+    """
+    late = 0  # Snapshots antérieurs aux jeux en retard
 
-class CardCounter:
     def __init__(self):
-        # Initialisation des compteurs et des listes de jeux pour chaque paire
-        self._PAIR_DATA: Dict[str, Dict[str, Any]] = {
-            "2/2": {"count": 0, "games": []},
-            "2/3": {"count": 0, "games": []},
-            "3/2": {"count": 0, "games": []},
-            "3/3": {"count": 0, "games": []}
-        }
-        
-        # Nouveau tracking: Victoires, Impair/Pair, Match nul
-        self._VICTORIES_DATA = {
-            "joueur": {"count": 0, "games": []},
-            "banquier": {"count": 0, "games": []},
-            "nul": {"count": 0, "games": []}
+        self.numbers = array('I')
+        self.columns: Dict[str, array] = {name: array('B') for name in CATEGORIES}
+        self.cards = array('B')
+        self.counts: Dict[str, List[int]] = {name: [0] * len(keys) for name, keys in CATEGORIES.items()}
+        self.suit_counts = [array('I', [0]) * 4 for _ in range(2)]
+        self.rank_counts = [array('I', [0]) * len(RANKS) for _ in range(2)]
+        # Messages rejetés par la validation (non comptés dans les statistiques)
+        self.rejected: Dict[str, int] = {reason: 0 for reason in REJECT_REASONS}
+        # Lignes les plus anciennes déplacées sur disque (voir spill), relues à la demande
+        self.segment_file: Optional[str] = None
+        self.spilled_rows = 0
+        self.late = 0  # Jeux comptés sans ligne
+
+    def __len__(self) -> int:
+        return self.spilled_rows + len(self.numbers)
+
+    def record_codes(self, record: GameRecord) -> Tuple[int, int, int]:
+        """Codes (paire, victoire, parité) d'un enregistrement."""
+        return (
+            CATEGORY_CODES["pair"].get(record.pair_key, NO_CODE),
+            CATEGORY_CODES["winner"].get(record.winner, NO_CODE),
+            CATEGORY_CODES["parity"].get(record.parity, NO_CODE),
+        )
+
+    def append(self, record: GameRecord) -> bool:
+        """Ajoute un jeu; retourne False si aucune catégorie n'a été reconnue."""
+        codes = self.record_codes(record)
+        if codes == (NO_CODE, NO_CODE, NO_CODE):
+            return False
+        self.append_row(record.number or 0, codes, self.record_cards(record))
+        return True
+
+    @staticmethod
+    def record_cards(record: GameRecord) -> Tuple[int, ...]:
+        """Cartes des deux côtés, complétées par NO_CODE (CARDS_PER_SIDE par côté)."""
+        padding = (NO_CODE,) * CARDS_PER_SIDE
+        return (record.cards1 + padding)[:CARDS_PER_SIDE] + (record.cards2 + padding)[:CARDS_PER_SIDE]
+
+    def append_row(self, number: int, codes: Tuple[int, ...], cards: Tuple[int, ...] = (NO_CODE,) * (2 * CARDS_PER_SIDE)):
+        """Ajoute une ligne (numéro, codes de catégories, cartes) et met à jour les compteurs."""
+        self.numbers.append(number)
+        for name, code in zip(CATEGORIES, codes):
+            self.columns[name].append(code)
+        self.cards.extend(cards)
+        self._count_row(codes, cards)
+
+    def count_late(self, codes: Tuple[int, ...], cards: Tuple[int, ...]):
+        """Compte un jeu arrivé hors d'ordre dans les seuls compteurs (aucune ligne: l'ordre des colonnes est conservé)."""
+        self._count_row(codes, cards)
+        self.late += 1
+
+    def _count_row(self, codes: Tuple[int, ...], cards: Tuple[int, ...]):
+        for name, code in zip(CATEGORIES, codes):
+            if code != NO_CODE:
+                self.counts[name][code] += 1
+        for i, card in enumerate(cards):
+            if card != NO_CODE:
+                side = i // CARDS_PER_SIDE
+                self.suit_counts[side][card % 4] += 1
+                self.rank_counts[side][card // 4] += 1
+
+    def first_codes(self) -> Optional[Tuple[int, ...]]:
+        """Codes de catégories de la première ligne (None si aucune)."""
+        for _, codes, _ in self.full_rows():
+            return codes
+        return None
+
+    def row_cards(self, index: int) -> Tuple[int, ...]:
+        start = index * 2 * CARDS_PER_SIDE
+        return tuple(self.cards[start:start + 2 * CARDS_PER_SIDE])
+
+    def rows(self) -> Iterator[Tuple[int, ...]]:
+        """Lignes (numéro, code paire, code victoire, code parité) dans l'ordre d'arrivée."""
+        if not self.spilled_rows:
+            return zip(self.numbers, *self.columns.values())
+        return ((number, *codes) for number, codes, _ in self.full_rows())
+
+    def full_rows(self) -> Iterator[Tuple[int, Tuple[int, ...], Tuple[int, ...]]]:
+        """(numéro, codes, cartes) de toutes les lignes: segments relus par blocs depuis le disque, puis la mémoire."""
+        categories = len(CATEGORIES)
+        if self.spilled_rows:
+            with open(self.segment_file, "rb") as f:
+                remaining = self.spilled_rows
+                while remaining:
+                    chunk = f.read(min(remaining, 4096) * _SEGMENT_ROW.size)
+                    if not chunk:
+                        break
+                    for number, *values in _SEGMENT_ROW.iter_unpack(chunk):
+                        yield number, tuple(values[:categories]), tuple(values[categories:])
+                    remaining -= len(chunk) // _SEGMENT_ROW.size
+        columns = list(self.columns.values())
+        for i, number in enumerate(self.numbers):
+            yield number, tuple(column[i] for column in columns), self.row_cards(i)
+
+    def spill(self, directory: str, keep: int) -> int:
+        """
+        Déplace les lignes les plus anciennes (toutes sauf les `keep` dernières) à la fin
+        du fichier de segments; les compteurs restent en mémoire. Retourne le nombre de lignes.
+        Seules les `spilled_rows` premières lignes du fichier sont lues: un arrêt entre
+        l'écriture et la sauvegarde de l'état ne crée pas de doublons.
+        """
+        count = len(self.numbers) - keep
+        if count <= 0:
+            return 0
+        if self.segment_file is None:
+            os.makedirs(directory, exist_ok=True)
+            self.segment_file = os.path.join(directory, f"segment-{uuid.uuid4().hex}.bin")
+        width = 2 * CARDS_PER_SIDE
+        columns = list(self.columns.values())
+        data = b"".join(
+            _SEGMENT_ROW.pack(self.numbers[i], *(column[i] for column in columns), *self.cards[i * width:(i + 1) * width])
+            for i in range(count)
+        )
+        with open(self.segment_file, "r+b" if os.path.exists(self.segment_file) else "wb") as f:
+            f.seek(self.spilled_rows * _SEGMENT_ROW.size)
+            f.write(data)
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+        del self.numbers[:count]
+        for column in columns:
+            del column[:count]
+        del self.cards[:count * width]
+        self.spilled_rows += count
+        return count
+
+    def discard_segments(self):
+        """Supprime le fichier de segments (état figé dont le bilan a été rendu)."""
+        if self.segment_file is not None:
+            try:
+                os.remove(self.segment_file)
+            except FileNotFoundError:
+                pass
+            self.segment_file = None
+
+    @classmethod
+    def merged(cls, first: "GameStore", second: "GameStore") -> "GameStore":
+        """
+        Fusionne deux stockages en respectant l'ordre chronologique des numéros de jeu.
+        L'ordre d'arrivée interne de chaque stockage est conservé.
+        """
+        store = cls()
+        for number, codes, cards in heapq.merge(first.full_rows(), second.full_rows(), key=itemgetter(0)):
+            store.append_row(number, codes, cards)
+        if first.late or second.late:
+            # Les jeux en retard n'ont pas de ligne: les compteurs sont la somme des deux côtés
+            store.late = first.late + second.late
+            store.counts = {name: [a + b for a, b in zip(first.counts[name], second.counts[name])]
+                            for name in CATEGORIES}
+            store.suit_counts = [array('I', map(add, *pair)) for pair in zip(first.suit_counts, second.suit_counts)]
+            store.rank_counts = [array('I', map(add, *pair)) for pair in zip(first.rank_counts, second.rank_counts)]
+        for reason in REJECT_REASONS:
+            store.rejected[reason] = first.rejected[reason] + second.rejected[reason]
+        return store
+
+    def count(self, category: str, key: str) -> int:
+        return self.counts[category][CATEGORY_CODES[category][key]]
+
+    def total(self, category: str) -> int:
+        return sum(self.counts[category])
+
+    def games(self, category: str, key: str) -> List[int]:
+        """Liste chronologique des numéros de jeu d'une catégorie, lue depuis les colonnes."""
+        code = CATEGORY_CODES[category][key]
+        index = 1 + list(CATEGORIES).index(category)
+        return [row[0] for row in self.rows() if row[index] == code and row[0]]
+
+    def card_frequencies(self) -> Dict[str, List[List[int]]]:
+        """Fréquences couleurs/rangs recalculées en bloc depuis la colonne des cartes."""
+        if self.spilled_rows:
+            return card_frequencies(array('B', (card for _, _, cards in self.full_rows() for card in cards)))
+        return card_frequencies(self.cards)
+
+    def nbytes(self) -> int:
+        """Taille mémoire des colonnes résidentes (hors surcoût des objets et segments sur disque)."""
+        return sum(col.itemsize * len(col) for col in (self.numbers, self.cards, *self.columns.values()))
+
+
+class RollingWindow:
+    """
+    Fenêtre glissante des N derniers jeux: tampons circulaires (numéro + codes de
+    catégories) avec compteurs mis à jour en O(1) à chaque jeu, mémoire fixe.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.numbers = array('I', [0]) * size
+        self.columns: Dict[str, array] = {name: array('B', [NO_CODE]) * size for name in CATEGORIES}
+        self.counts: Dict[str, List[int]] = {name: [0] * len(keys) for name, keys in CATEGORIES.items()}
+        self.position = 0
+        self.filled = 0
+
+    def __len__(self) -> int:
+        return self.filled
+
+    def push(self, number: int, codes: Tuple[int, ...]):
+        """Ajoute un jeu et retire le plus ancien si la fenêtre est pleine."""
+        pos = self.position
+        for name, code in zip(CATEGORIES, codes):
+            column = self.columns[name]
+            counts = self.counts[name]
+            old = column[pos]
+            if old != NO_CODE:
+                counts[old] -= 1
+            column[pos] = code
+            if code != NO_CODE:
+                counts[code] += 1
+        self.numbers[pos] = number
+        self.position = (pos + 1) % self.size
+        if self.filled < self.size:
+            self.filled += 1
+
+    def rows(self) -> Iterator[Tuple[int, ...]]:
+        """Lignes (numéro, codes...) du plus ancien au plus récent."""
+        start = self.position if self.filled == self.size else 0
+        order = [(start + i) % self.size for i in range(self.filled)]
+        columns = list(self.columns.values())
+        return ((self.numbers[i], *(col[i] for col in columns)) for i in order)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Pourcentages par catégorie sur la fenêtre (calculés à la demande depuis les compteurs)."""
+        result = {}
+        for name, keys in CATEGORIES.items():
+            counts = self.counts[name]
+            total = sum(counts)
+            result[name] = {key: (count * 100 / total if total else 0.0) for key, count in zip(keys, counts)}
+        return result
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """Colonnes de la fenêtre (ordre chronologique) en tableaux NumPy."""
+        if np is None:
+            raise RuntimeError("NumPy n'est pas installé")
+        start = self.position if self.filled == self.size else 0
+        def ordered(column):
+            values = np.frombuffer(column, dtype=np.uint32 if column.typecode == 'I' else np.uint8)
+            return np.roll(values, -start)[:self.filled].copy()
+        arrays = {name: ordered(column) for name, column in self.columns.items()}
+        arrays["number"] = ordered(self.numbers)
+        return arrays
+
+    def copy(self) -> "RollingWindow":
+        window = RollingWindow(self.size)
+        window.numbers = array('I', self.numbers)
+        window.columns = {name: array('B', column) for name, column in self.columns.items()}
+        window.counts = {name: list(counts) for name, counts in self.counts.items()}
+        window.position, window.filled = self.position, self.filled
+        return window
+
+    @classmethod
+    def merged(cls, first: "RollingWindow", second: "RollingWindow") -> "RollingWindow":
+        """Fenêtre des N derniers jeux de la fusion chronologique des deux fenêtres."""
+        window = cls(first.size)
+        for row in heapq.merge(first.rows(), second.rows(), key=itemgetter(0)):
+            window.push(row[0], row[1:])
+        return window
+
+
+class StreakTracker:
+    """
+    Séries (jeux consécutifs dans la même catégorie) en cours et plus longues séries
+    par clé, avec numéros de début et de fin. Mise à jour O(1) par jeu.
+    """
+
+    def __init__(self):
+        # Série en cours par catégorie: [code, longueur, numéro de début, numéro de fin]
+        self.current: Dict[str, List[int]] = {name: [NO_CODE, 0, 0, 0] for name in CATEGORIES}
+        # Record par clé: (longueur, numéro de début, numéro de fin)
+        self.longest: Dict[str, List[Tuple[int, int, int]]] = {
+            name: [(0, 0, 0)] * len(keys) for name, keys in CATEGORIES.items()
         }
-        
-        self._ODD_EVEN_DATA = {
-            "odd": {"count": 0, "games": []},
-            "even": {"count": 0, "games": []}
+
+    def push(self, number: int, codes: Tuple[int, ...]):
+        for name, code in zip(CATEGORIES, codes):
+            run = self.current[name]
+            if code == NO_CODE:
+                # Catégorie absente: la série est interrompue
+                run[:] = [NO_CODE, 0, 0, 0]
+                continue
+            if run[0] == code:
+                run[1] += 1
+                run[3] = number
+            else:
+                run[:] = [code, 1, number, number]
+            best = self.longest[name]
+            if run[1] > best[code][0]:
+                best[code] = (run[1], run[2], run[3])
+
+    def current_run(self, category: str) -> Tuple[Optional[str], int]:
+        """(clé, longueur) de la série en cours pour une catégorie."""
+        code, length = self.current[category][0], self.current[category][1]
+        return (CATEGORIES[category][code] if code != NO_CODE else None), length
+
+    def longest_run(self, category: str, key: str) -> Tuple[int, int, int]:
+        """(longueur, début, fin) de la plus longue série d'une clé."""
+        return self.longest[category][CATEGORY_CODES[category][key]]
+
+
+class TransitionCounter:
+    """
+    Comptes de transitions du premier ordre (jeu → jeu suivant) par catégorie,
+    stockés en matrices carrées aplaties (array('I')), mis à jour en O(1) par jeu.
+    """
+
+    def __init__(self):
+        self.counts: Dict[str, array] = {name: array('I', [0]) * (len(keys) ** 2) for name, keys in CATEGORIES.items()}
+        self.last: Dict[str, int] = {name: NO_CODE for name in CATEGORIES}
+
+    def push(self, codes: Tuple[int, ...]):
+        for name, code in zip(CATEGORIES, codes):
+            previous = self.last[name]
+            if previous != NO_CODE and code != NO_CODE:
+                self.counts[name][previous * len(CATEGORIES[name]) + code] += 1
+            self.last[name] = code
+
+    def matrix(self, category: str) -> List[List[int]]:
+        """Matrice [de][vers] dans l'ordre de CATEGORIES[category]."""
+        size = len(CATEGORIES[category])
+        flat = self.counts[category]
+        return [list(flat[row * size:(row + 1) * size]) for row in range(size)]
+
+    def to_numpy(self, category: str) -> Any:
+        """Matrice [de][vers] en tableau NumPy (uint32)."""
+        if np is None:
+            raise RuntimeError("NumPy n'est pas installé")
+        size = len(CATEGORIES[category])
+        return np.frombuffer(self.counts[category], dtype=np.uint32).reshape(size, size).copy()
+
+    def add_counts(self, other: "TransitionCounter"):
+        """Ajoute les comptes d'un autre compteur (les transitions à la jonction sont ignorées)."""
+        for name, counts in self.counts.items():
+            for i, value in enumerate(other.counts[name]):
+                counts[i] += value
+
+    def subtract_counts(self, other: "TransitionCounter"):
+        """Retire les comptes d'un autre compteur, déjà inclus dans celui-ci."""
+        for name, counts in self.counts.items():
+            for i, value in enumerate(other.counts[name]):
+                counts[i] -= value
+
+    def add_junction(self, last: Dict[str, int], codes: Optional[Tuple[int, ...]], weight: int = 1):
+        """Ajoute (ou retire, weight=-1) la transition des derniers codes `last` vers `codes`."""
+        if codes is None:
+            return
+        for name, code in zip(CATEGORIES, codes):
+            previous = last[name]
+            if previous != NO_CODE and code != NO_CODE:
+                self.counts[name][previous * len(CATEGORIES[name]) + code] += weight
+
+
+class GameListRenderer:
+    """
+    Liste chronologique "**#N…**" formatée au fil de l'eau: chaque ligne complète
+    (10 numéros) est formatée une seule fois puis ajoutée à un flux deflate tenu dans un
+    seul tampon; seule la ligne en cours reste sous forme de numéros. Le texte est
+    décompressé à la demande, au rendu du bilan.
+    Sous budget mémoire, le tampon est déplacé à la fin d'un fichier (voir spill): le
+    flux y est coupé par un Z_FULL_FLUSH, si bien que la partie résidente se décompresse seule.
+    """
+    PER_LINE = 10
+    WBITS = -9      # Flux deflate brut, fenêtre de 512 octets (quelques Kio d'état par liste)
+    MEM_LEVEL = 1
+
+    def __init__(self):
+        self._buffer = bytearray()  # Lignes complètes compressées, non encore déplacées sur disque
+        self._tail = array('I')     # Numéros de la ligne en cours
+        self._count = 0
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, self.WBITS, self.MEM_LEVEL)
+        self._unflushed = False
+        self.file: Optional[str] = None
+        self.spilled = 0            # Numéros déjà sur disque
+        self._spilled_bytes = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def nbytes(self) -> int:
+        """Taille mémoire du texte compressé et de la ligne en cours."""
+        return len(self._buffer) + self._tail.itemsize * len(self._tail)
+
+    def append(self, number: int):
+        self._tail.append(number)
+        self._count += 1
+        if len(self._tail) == self.PER_LINE:
+            self._buffer += self._compressor.compress(self._format(self._tail).encode() + b"\n")
+            self._unflushed = True
+            self._tail = array('I')
+
+    @staticmethod
+    def _format(numbers: Iterable[int]) -> str:
+        return " ".join(f"**#N{number}**" for number in numbers)
+
+    def spill(self, path: str):
+        """
+        Ajoute les lignes complètes compressées à la fin de `path` (la ligne en cours reste
+        en mémoire). Comme pour GameStore.spill, seuls les octets déjà comptés sont conservés.
+        """
+        if not self._unflushed and not self._buffer:
+            return
+        # Même après un Z_SYNC_FLUSH (rendu), le dictionnaire doit être remis à zéro ici
+        self._buffer += self._compressor.flush(zlib.Z_FULL_FLUSH)
+        self._unflushed = False
+        self.file = path
+        with open(path, "r+b" if self._spilled_bytes and os.path.exists(path) else "wb") as f:
+            f.seek(self._spilled_bytes)
+            f.write(self._buffer)
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+        self._spilled_bytes += len(self._buffer)
+        self.spilled = self._count - len(self._tail)
+        self._buffer = bytearray()
+
+    def discard(self):
+        """Supprime le fichier des lignes déplacées sur disque."""
+        if self.file is not None:
+            try:
+                os.remove(self.file)
+            except FileNotFoundError:
+                pass
+            self.file = None
+
+    def text(self, include_spilled: bool = True) -> str:
+        """Texte (10 numéros par ligne): complet, ou seulement la partie résidente en mémoire."""
+        if self._unflushed:
+            self._buffer += self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._unflushed = False
+        data = bytes(self._buffer)
+        if include_spilled and self._spilled_bytes:
+            with open(self.file, "rb") as f:
+                data = f.read(self._spilled_bytes) + data
+        lines = zlib.decompressobj(self.WBITS).decompress(data).decode()
+        return lines + self._format(self._tail) if self._tail else lines[:-1]
+
+
+class CardCounter:
+    # Attributs propres à la fenêtre en cours (échangés par detach)
+    _WINDOW_STATE = ("_store", "_renderers", "_streaks", "_transitions", "_section_cache", "_report_cache")
+
+    def __init__(self):
+        # Colonnes des jeux (paires, victoires joueur/banquier/nul, impair/pair) + compteurs
+        self._store = GameStore()
+        self._init_derived_state()
+        # Fenêtres glissantes et transitions cumulées: conservées à travers les resets horaires
+        self._windows: Dict[int, RollingWindow] = {size: RollingWindow(size) for size in WINDOW_SIZES}
+        self._cumulative_transitions = TransitionCounter()
+        # Derniers codes du cumul au début de la fenêtre en cours (jonction avec l'heure précédente)
+        self._window_start_last: Dict[str, int] = dict(self._cumulative_transitions.last)
+        # Journal d'écriture anticipée (voir counter_journal.CounterJournal), None si non persisté
+        self.journal = None
+        # Budget mémoire (octets, 0 = illimité): au-delà, les jeux anciens sont déplacés sur disque
+        self.memory_budget = 0
+        self.spill_dir = os.path.join("data", "segments")
+
+    def _init_derived_state(self):
+        """Structures dérivées du stockage: listes formatées, séries, sections en cache, version."""
+        self._streaks = StreakTracker()
+        self._transitions = TransitionCounter()
+        self._renderers: Dict[Tuple[str, str], GameListRenderer] = {
+            (name, key): GameListRenderer() for name, keys in CATEGORIES.items() for key in keys
         }
+        self._section_cache: Dict[str, Tuple[Any, str]] = {}
+        self._report_cache: Optional[Tuple[int, str]] = None
+        self._version = getattr(self, "_version", 0) + 1
+
+    @property
+    def version(self) -> int:
+        """Numéro de version de l'état, incrémenté à chaque jeu enregistré ou reset."""
+        return self._version
+
+    def parse_message(self, text: str) -> GameRecord:
+        """Lit le message une seule fois et retourne l'enregistrement du jeu."""
+        return parse_game(text)
 
     def extract_groups(self, text: str) -> Tuple[Optional[str], Optional[str]]:
         """Extrait les deux premiers groupes entre parenthèses"""
-        groups = re.findall(r"\(([^)]*)\)", text)
+        groups = _GROUPS_RE.findall(text)
         return groups[0] if len(groups) >= 1 else None, groups[1] if len(groups) >= 2 else None
 
     def extract_game_number(self, text: str) -> Optional[int]:
         """Extrait le numéro de jeu #N"""
-        match = re.search(r'#N(\d+)', text)
+        match = _GAME_NUMBER_RE.search(text)
         return int(match.group(1)) if match else None
 
     def extract_t_number(self, text: str) -> Optional[int]:
         """Extrait le numéro #T pour pair/impair"""
-        match = re.search(r'#T(\d+)', text)
+        match = _T_NUMBER_RE.search(text)
         return int(match.group(1)) if match else None
 
     def extract_points(self, text: str) -> Tuple[Optional[int], Optional[int]]:
         """Extrait les points Pg1 et Pg2 du format: #N1127. 1(A♠️3♠️7♣️) - ✅5(Q♠️5♦️J♦️)"""
-        # Pattern: #N\d+\. ... chiffre ( ... ) - chiffre (
-        # On cherche: un nombre avant une parenthèse, puis après le "-", un autre nombre avant une parenthèse
-        pattern = r'#N\d+\.\s*(\d+)\([^)]*\)\s*-\s*[✅🔰]?(\d+)\('
-        match = re.search(pattern, text)
-        if match:
-            pg1 = int(match.group(1))
-            pg2 = int(match.group(2))
-            return pg1, pg2
-        return None, None
+        record = parse_game(text)
+        return record.pg1, record.pg2
 
     def count_symbols(self, group: str) -> int:
         """
@@ -57,11 +779,10 @@ class CardCounter:
         Utilise regex pour éviter le double comptage des symboles avec/sans variante emoji.
         """
         # Regex qui capture les symboles de carte (avec ou sans variante emoji FE0F)
-        pattern = r'[♠♥♦♣]️?'
-        matches = re.findall(pattern, group)
+        matches = _SYMBOL_RE.findall(group)
         count = len(matches)
         
-        print(f"🔍 DEBUG: groupe='{group}' → {count} cartes détectées: {matches}")
+        logger.debug("🔍 groupe='%s' → %d cartes détectées: %s", group, count, matches, extra={"sampled": True})
         
         # Le jeu doit être soit 2 cartes, soit 3 cartes pour être valide
         if count in (2, 3):
@@ -72,263 +793,395 @@ class CardCounter:
         """Alias pour le nombre total de cartes uniques."""
         return self.count_symbols(group)
 
-    def update_pair_counts(self, msg_text: str, game_number: Optional[int]):
-        """Met à jour le compteur des paires et stocke le numéro de jeu."""
-        group1, group2 = self.extract_groups(msg_text)
+    def apply(self, record: GameRecord) -> bool:
+        """Enregistre un jeu déjà parsé (paire, victoire et parité) dans le stockage colonnaire."""
+        codes = self._store.record_codes(record)
+        if codes == (NO_CODE, NO_CODE, NO_CODE):
+            return False
+        self.apply_row(record.number or 0, codes, GameStore.record_cards(record))
+        return True
 
-        if not group1 or not group2:
-            return
+    def apply_row(self, number: int, codes: Tuple[int, ...], cards: Tuple[int, ...]):
+        """Enregistre une ligne déjà encodée (numéro, codes de catégories, cartes); sert aussi au rejeu du journal."""
+        self._store.append_row(number, codes, cards)
+        self._version += 1
+        self._index_row(number, codes)
+        for window in self._windows.values():
+            window.push(number, codes)
+        self._cumulative_transitions.push(codes)
+        if self.journal is not None:
+            self.journal.record_row(number, codes, cards)
+        if self.memory_budget and len(self._store) % SPILL_CHECK_EVERY == 0:
+            self._enforce_memory_budget()
 
-        # 1. Compter les cartes uniques dans chaque groupe
-        count1 = self.get_total_unique_cards(group1)
-        count2 = self.get_total_unique_cards(group2)
-        
-        # 2. Vérifier si les comptes sont 2 ou 3
-        is_count1_valid = count1 in (2, 3)
-        is_count2_valid = count2 in (2, 3)
-        
-        if is_count1_valid and is_count2_valid:
-            # 3. Créer la clé de paire (ex: "2/3")
-            pair_key = f"{count1}/{count2}"
-            
-            # 4. Mettre à jour le compteur global et la liste des jeux
-            if pair_key in self._PAIR_DATA:
-                data = self._PAIR_DATA[pair_key]
-                data["count"] += 1
-                if game_number is not None:
-                    data["games"].append(game_number)
-
-    def update_victories(self, msg_text: str, game_number: Optional[int]):
-        """Analyse les victoires basées sur la position du checkmark (✅)"""
-        
-        # Match nul si 🔰 dans le message
-        if "🔰" in msg_text:
-            self._VICTORIES_DATA["nul"]["count"] += 1
-            if game_number is not None:
-                self._VICTORIES_DATA["nul"]["games"].append(game_number)
+    def apply_late(self, record: GameRecord) -> bool:
+        """
+        Enregistre un jeu relu en retard (arrivé après des jeux plus récents): seuls les
+        compteurs indépendants de l'ordre sont mis à jour (catégories, couleurs, rangs,
+        nombre de jeux). Listes chronologiques, séries, transitions et fenêtres glissantes
+        l'ignorent, pour ne pas y enregistrer une succession qui n'a pas eu lieu.
+        """
+        codes = self._store.record_codes(record)
+        if codes == (NO_CODE, NO_CODE, NO_CODE):
+            return False
+        self.apply_late_row(record.number or 0, codes, GameStore.record_cards(record))
+        return True
+
+    def apply_late_row(self, number: int, codes: Tuple[int, ...], cards: Tuple[int, ...]):
+        """Voir apply_late; sert aussi au rejeu du journal."""
+        self._store.count_late(codes, cards)
+        self._version += 1
+        if self.journal is not None:
+            self.journal.record_late(number, codes, cards)
+
+    def set_memory_budget(self, budget: int, spill_dir: Optional[str] = None):
+        """Fixe le budget mémoire du stockage et des listes formatées (0 = illimité)."""
+        self.memory_budget = budget
+        if spill_dir:
+            self.spill_dir = spill_dir
+
+    def memory_usage(self) -> int:
+        """Estimation de la mémoire des jeux de la fenêtre en cours (colonnes, listes formatées, rapport en cache)."""
+        usage = self._store.nbytes() + sum(renderer.nbytes() for renderer in self._renderers.values())
+        if self._report_cache is not None:
+            usage += sys.getsizeof(self._report_cache[1])
+        return usage
+
+    def _enforce_memory_budget(self):
+        if self.memory_usage() <= self.memory_budget:
             return
+        # On garde un quart des lignes résidentes; les listes formatées partent en entier sur disque
+        spilled = self._store.spill(self.spill_dir, keep=len(self._store.numbers) // 4)
+        self._spill_renderers()
+        self._report_cache = None
+        logger.info("💾 Budget mémoire dépassé : %d jeux déplacés sur disque (%d au total)",
+                    spilled, self._store.spilled_rows)
+        if self.journal is not None:
+            self.journal.snapshot(self)
 
-        # Chercher la position du checkmark ✅
-        # Pattern: ✅ peut être avant le premier groupe (victoire Joueur) ou avant le second groupe (victoire Banquier)
-        # Exemple 1: #N151. 1(...) - ✅2(...) → Banquier a ✅ → Banquier gagne
-        # Exemple 2: #N153. ✅7(...) - 3(...) → Joueur a ✅ → Joueur gagne
-        
-        # Chercher si ✅ est avant le premier groupe (nombre avant la parenthèse)
-        pattern_joueur = r'#N\d+\.\s*✅\d+\('
-        # Chercher si ✅ est avant le second groupe (après le tiret)
-        pattern_banquier = r'-\s*✅\d+\('
-        
-        if re.search(pattern_joueur, msg_text):
-            # Victoire Joueur (✅ avant le premier groupe)
-            self._VICTORIES_DATA["joueur"]["count"] += 1
-            if game_number is not None:
-                self._VICTORIES_DATA["joueur"]["games"].append(game_number)
-        elif re.search(pattern_banquier, msg_text):
-            # Victoire Banquier (✅ avant le second groupe)
-            self._VICTORIES_DATA["banquier"]["count"] += 1
-            if game_number is not None:
-                self._VICTORIES_DATA["banquier"]["games"].append(game_number)
-
-    def update_odd_even(self, msg_text: str, game_number: Optional[int]):
-        """Analyse pair/impair basé sur le numéro #T"""
-        t_number = self.extract_t_number(msg_text)
-        if t_number is None:
+    def _spill_renderers(self):
+        """Déplace les listes formatées à côté du fichier de segments du stockage."""
+        if self._store.segment_file is None:
             return
+        for (name, key), renderer in self._renderers.items():
+            renderer.spill(f"{self._store.segment_file}.{name}{CATEGORY_CODES[name][key]}")
 
-        if t_number % 2 == 0:
-            # Pair
-            self._ODD_EVEN_DATA["even"]["count"] += 1
-            if game_number is not None:
-                self._ODD_EVEN_DATA["even"]["games"].append(game_number)
-        else:
-            # Impair
-            self._ODD_EVEN_DATA["odd"]["count"] += 1
-            if game_number is not None:
-                self._ODD_EVEN_DATA["odd"]["games"].append(game_number)
+    def _discard_renderers(self):
+        for renderer in self._renderers.values():
+            renderer.discard()
 
-    def reset_all(self):
-        """Réinitialise les compteurs de paires et les listes de jeux."""
-        self._PAIR_DATA = {
-            "2/2": {"count": 0, "games": []}, 
-            "2/3": {"count": 0, "games": []}, 
-            "3/2": {"count": 0, "games": []}, 
-            "3/3": {"count": 0, "games": []}
-        }
-        self._VICTORIES_DATA = {
-            "joueur": {"count": 0, "games": []},
-            "banquier": {"count": 0, "games": []},
-            "nul": {"count": 0, "games": []}
+    def release(self):
+        """Supprime les segments sur disque d'un état détaché, une fois son bilan rendu."""
+        self._store.discard_segments()
+        self._discard_renderers()
+
+    def _index_row(self, number: int, codes: Tuple[int, ...]):
+        """Met à jour les structures dérivées (listes formatées, séries) pour une ligne du stockage."""
+        self._streaks.push(number, codes)
+        self._transitions.push(codes)
+        if number:
+            for name, code in zip(CATEGORIES, codes):
+                if code != NO_CODE:
+                    self._renderers[(name, CATEGORIES[name][code])].append(number)
+
+    def merge(self, other: "CardCounter") -> "CardCounter":
+        """
+        Fusionne l'état d'un autre compteur dans celui-ci, comme si les deux flux de
+        messages avaient été traités par un seul compteur (listes en ordre chronologique).
+        Le cumul de chaque côté vaut historique + jonction avec sa fenêtre + transitions de
+        la fenêtre: on garde les deux historiques, on recalcule les transitions sur les lignes
+        fusionnées et on ajoute une seule jonction, depuis l'historique de ce compteur
+        (ou de l'autre s'il n'en a pas).
+        """
+        cumulative = self._cumulative_transitions
+        for side in (self, other):
+            if side is not self:
+                cumulative.add_counts(side._cumulative_transitions)
+            cumulative.subtract_counts(side._transitions)
+            cumulative.add_junction(side._window_start_last, side._store.first_codes(), -1)
+        has_history = any(code != NO_CODE for code in self._window_start_last.values())
+        start_last = dict(self._window_start_last if has_history else other._window_start_last)
+
+        previous, self._store = self._store, GameStore.merged(self._store, other._store)
+        previous.discard_segments()
+        self._discard_renderers()
+        self._windows = {
+            size: RollingWindow.merged(window, other._windows[size]) for size, window in self._windows.items()
         }
-        self._ODD_EVEN_DATA = {
-            "odd": {"count": 0, "games": []},
-            "even": {"count": 0, "games": []}
+        self._reindex()
+        cumulative.add_counts(self._transitions)
+        cumulative.add_junction(start_last, self._store.first_codes())
+        self._window_start_last = start_last
+        cumulative.last = dict(self._transitions.last) if len(self._store) else dict(start_last)
+        if self.journal is not None:
+            self.journal.snapshot(self)
+        return self
+
+    def _reindex(self):
+        """Reconstruit les structures dérivées à partir des lignes du stockage."""
+        self._init_derived_state()
+        for row in self._store.rows():
+            self._index_row(row[0], row[1:])
+        if self._store.spilled_rows:
+            # Listes relues depuis les segments: elles repartent aussitôt sur disque
+            self._spill_renderers()
+
+    def snapshot_state(self) -> Dict[str, Any]:
+        """État minimal à sauvegarder (les structures dérivées sont reconstruites à la restauration)."""
+        return {
+            "store": self._store,
+            "windows": self._windows,
+            "cumulative_transitions": self._cumulative_transitions,
+            "window_start_last": self._window_start_last,
         }
 
+    def restore_state(self, state: Dict[str, Any]):
+        """Remplace l'état courant par un état issu de snapshot_state."""
+        self._store = state["store"]
+        self._windows = state["windows"]
+        self._cumulative_transitions = state["cumulative_transitions"]
+        self._window_start_last = state.get("window_start_last", {name: NO_CODE for name in CATEGORIES})
+        self._reindex()
+        if self.memory_budget:
+            self._enforce_memory_budget()
+
+    def reset_all(self):
+        """Réinitialise les compteurs de paires et les listes de jeux."""
+        self._store.discard_segments()
+        self._discard_renderers()
+        self._store = GameStore()
+        self._init_derived_state()
+        self._window_start_last = dict(self._cumulative_transitions.last)
+        if self.journal is not None:
+            self.journal.snapshot(self)
+
     # --- FONCTIONS D'ANALYSE 3K/2K ---
     
     def get_player_k_counts(self) -> Tuple[int, int]:
         """Calcule et retourne le total 3K et 2K basés sur le Joueur (le premier nombre dans X/Y)."""
-        count_3k_joueur = self._PAIR_DATA["3/2"]["count"] + self._PAIR_DATA["3/3"]["count"]
-        count_2k_joueur = self._PAIR_DATA["2/2"]["count"] + self._PAIR_DATA["2/3"]["count"]
+        count_3k_joueur = self._store.count("pair", "3/2") + self._store.count("pair", "3/3")
+        count_2k_joueur = self._store.count("pair", "2/2") + self._store.count("pair", "2/3")
         return count_3k_joueur, count_2k_joueur
     
     def get_banker_k_counts(self) -> Tuple[int, int]:
         """Calcule et retourne le total 3K et 2K basés sur le Banquier (le second nombre dans X/Y)."""
-        count_3k_banker = self._PAIR_DATA["2/3"]["count"] + self._PAIR_DATA["3/3"]["count"]
-        count_2k_banker = self._PAIR_DATA["2/2"]["count"] + self._PAIR_DATA["3/2"]["count"]
+        count_3k_banker = self._store.count("pair", "2/3") + self._store.count("pair", "3/3")
+        count_2k_banker = self._store.count("pair", "2/2") + self._store.count("pair", "3/2")
         return count_3k_banker, count_2k_banker
 
 
     # --- MISE À JOUR DU BILAN INSTANTANÉ (Message 1 - Prioritaire) ---
 
-    def get_instant_bilan_text(self) -> str:
-        """Génère la SYNTHÈSE INSTANTANÉE avec toutes les statistiques séparées et pourcentages."""
-        total_pairs = sum(data["count"] for data in self._PAIR_DATA.values())
+    def _cached_section(self, name: str, key: Any, build) -> str:
+        """Retourne la section en cache tant que ses compteurs (key) n'ont pas changé."""
+        cached = self._section_cache.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        text = "\n".join(build())
+        self._section_cache[name] = (key, text)
+        return text
+
+    def _count_section(self, title: str, rows: List[Tuple[str, int]], total: int) -> List[str]:
+        lines = [title, "─────────────────────────────────"]
+        for label, count in rows:
+            pct = count * 100 / total if total > 0 else 0
+            lines.append(f"{label} : {count:3d} ({pct:6.2f}%)")
+        lines.append("")
+        return lines
+
+    def get_game_count(self) -> int:
+        """Nombre de jeux comptés depuis le dernier reset (jeux en retard compris)."""
+        return len(self._store) + self._store.late
+
+    def get_counts(self) -> Dict[str, Dict[str, int]]:
+        """Nombre de jeux par clé pour chaque catégorie (paire, victoire, parité)."""
+        return {name: dict(zip(keys, self._store.counts[name])) for name, keys in CATEGORIES.items()}
+
+    def get_suit_counts(self) -> Dict[str, Dict[str, int]]:
+        """Nombre de cartes par couleur pour le Joueur et le Banquier."""
+        return {
+            side: dict(zip(SUIT_LABELS, self._store.suit_counts[i]))
+            for i, side in enumerate(("joueur", "banquier"))
+        }
+
+    def get_rank_counts(self) -> Dict[str, Dict[str, int]]:
+        """Nombre de cartes par rang pour le Joueur et le Banquier."""
+        return {
+            side: dict(zip(RANKS, self._store.rank_counts[i]))
+            for i, side in enumerate(("joueur", "banquier"))
+        }
+
+    def _build_suits_section(self) -> List[str]:
+        lines = ["", "♠️♥️♦️♣️ COULEURS (Joueur | Banquier)", "─────────────────────────────────"]
+        totals = [sum(counts) for counts in self._store.suit_counts]
+        for code, label in enumerate(SUIT_LABELS):
+            cells = []
+            for side in range(2):
+                count = self._store.suit_counts[side][code]
+                pct = count * 100 / totals[side] if totals[side] else 0
+                cells.append(f"{count:3d} ({pct:5.1f} %)")
+            lines.append(f"{label} : {cells[0]} | {cells[1]}")
+        return lines
+
+    def get_window_summaries(self) -> Dict[int, Dict[str, Dict[str, float]]]:
+        """Pourcentages des derniers N jeux pour chaque fenêtre glissante."""
+        return {size: window.summary() for size, window in self._windows.items()}
+
+    def _get_recent_text(self) -> Optional[str]:
+        """Section TENDANCE RÉCENTE (fenêtres glissantes, indépendantes des resets)."""
+        if not any(len(window) for window in self._windows.values()):
+            return None
+        lines = ["", "📈 TENDANCE RÉCENTE (derniers jeux)", "─────────────────────────────────"]
+        for size, window in self._windows.items():
+            if not len(window):
+                continue
+            pct = window.summary()
+            lines.append(
+                f"🕐 {size} derniers ({len(window)}) : "
+                f"👤 {pct['winner']['joueur']:.1f}% 🏦 {pct['winner']['banquier']:.1f}% ⚖️ {pct['winner']['nul']:.1f}%"
+                f" · 🔵 {pct['parity']['even']:.1f}% 🔴 {pct['parity']['odd']:.1f}%"
+            )
+            lines.append("   " + " ".join(f"{key} {pct['pair'][key]:.1f}%" for key in PAIR_DISPLAY_ORDER))
+        return "\n".join(lines)
+
+    def get_streaks(self) -> Dict[str, Dict[str, Any]]:
+        """Séries en cours et records (longueur, début, fin) par catégorie."""
+        return {
+            name: {
+                "current": self._streaks.current_run(name),
+                "longest": {key: self._streaks.longest_run(name, key) for key in keys},
+            }
+            for name, keys in CATEGORIES.items()
+        }
+
+    def _get_streaks_text(self) -> str:
+        """Section SÉRIES: série en cours et plus longue série par clé."""
+        lines = ["", "🔁 SÉRIES (en cours / record)", "─────────────────────────────────"]
+        current = []
+        for name in CATEGORIES:
+            key, length = self._streaks.current_run(name)
+            if key is not None:
+                current.append(f"{KEY_LABELS[key]} ×{length}")
+        lines.append("▶️ En cours : " + (" · ".join(current) if current else "aucune"))
+        for name, keys in CATEGORIES.items():
+            for key in (PAIR_DISPLAY_ORDER if name == "pair" else keys):
+                length, start, end = self._streaks.longest_run(name, key)
+                if length:
+                    lines.append(f"{KEY_LABELS[key]} : record {length} (#N{start} → #N{end})")
+        return "\n".join(lines)
+
+    def _games_section(self, title: str, category: str, key: str, empty: str, include_spilled: bool) -> str:
+        renderer = self._renderers[(category, key)]
+        lines = ["", title, "─────────────────────────────────"]
+        if not len(renderer):
+            lines.append(empty)
+        elif include_spilled or not renderer.spilled:
+            lines.append(renderer.text())
+        else:
+            # Les numéros sur disque ne sont relus que pour le bilan horaire (rendu hors de la boucle)
+            lines.append(f"📦 {renderer.spilled} numéros plus anciens : voir le bilan horaire")
+            text = renderer.text(include_spilled=False)
+            if text:
+                lines.append(text)
+        return "\n".join(lines)
+
+    def get_instant_bilan_text(self, include_spilled: bool = False) -> str:
+        """
+        Génère la SYNTHÈSE INSTANTANÉE avec toutes les statistiques séparées et pourcentages.
+        Les listes ne contiennent que les numéros en mémoire, sauf avec include_spilled.
+        """
+        total_pairs = self._store.total("pair")
         
         if total_pairs == 0:
             return "✨ Statistiques Complètes ✨\n━━━━━━━━━━━━━━━━━━━━\n📈 Total jeux analysés : 0\n\nAucune donnée analysée pour le moment."
 
-        lines = [
+        counts = self._store.counts
+        header = [
             "✨ STATISTIQUES COMPLÈTES ✨",
             "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
             f"📊 Total jeux analysés : {total_pairs}",
-            ""
         ]
+        rejected = sum(self._store.rejected.values())
+        if rejected:
+            header.append(f"🚫 Messages rejetés : {rejected} (cartes: {self._store.rejected['cartes']}, points: {self._store.rejected['points']})")
+        if self._store.late:
+            header.append(f"🕰️ Jeux relus en retard : {self._store.late} (totaux seulement, hors listes et séries)")
+        header.append("")
+        sections = ["\n".join(header)]
 
         # --- VICTOIRES JOUEUR/BANQUIER/NUL ---
-        joueur_wins = self._VICTORIES_DATA["joueur"]["count"]
-        banquier_wins = self._VICTORIES_DATA["banquier"]["count"]
-        nul_wins = self._VICTORIES_DATA["nul"]["count"]
-        
-        lines.append("🎯 VICTOIRES (Joueur/Banquier/Nul)")
-        lines.append("─────────────────────────────────")
-        joueur_pct = joueur_wins * 100 / total_pairs if total_pairs > 0 else 0
-        banquier_pct = banquier_wins * 100 / total_pairs if total_pairs > 0 else 0
-        nul_pct = nul_wins * 100 / total_pairs if total_pairs > 0 else 0
-        
-        lines.append(f"👤 Joueur   : {joueur_wins:3d} ({joueur_pct:6.2f}%)")
-        lines.append(f"🏦 Banquier : {banquier_wins:3d} ({banquier_pct:6.2f}%)")
-        lines.append(f"⚖️  Nul      : {nul_wins:3d} ({nul_pct:6.2f}%)")
-        lines.append("")
+        joueur_wins, banquier_wins, nul_wins = counts["winner"]
+        sections.append(self._cached_section(
+            "victories", (total_pairs, joueur_wins, banquier_wins, nul_wins),
+            lambda: self._count_section("🎯 VICTOIRES (Joueur/Banquier/Nul)", [
+                ("👤 Joueur  ", joueur_wins),
+                ("🏦 Banquier", banquier_wins),
+                ("⚖️  Nul     ", nul_wins),
+            ], total_pairs)
+        ))
 
         # --- PAIR / IMPAIR ---
-        odd_count = self._ODD_EVEN_DATA["odd"]["count"]
-        even_count = self._ODD_EVEN_DATA["even"]["count"]
-        
-        lines.append("🔄 PAIR / IMPAIR")
-        lines.append("─────────────────────────────────")
-        even_pct = even_count * 100 / total_pairs if total_pairs > 0 else 0
-        odd_pct = odd_count * 100 / total_pairs if total_pairs > 0 else 0
-        
-        lines.append(f"🔵 Pair   : {even_count:3d} ({even_pct:6.2f}%)")
-        lines.append(f"🔴 Impair : {odd_count:3d} ({odd_pct:6.2f}%)")
-        lines.append("")
+        odd_count, even_count = counts["parity"]
+        sections.append(self._cached_section(
+            "odd_even", (total_pairs, odd_count, even_count),
+            lambda: self._count_section("🔄 PAIR / IMPAIR", [
+                ("🔵 Pair  ", even_count),
+                ("🔴 Impair", odd_count),
+            ], total_pairs)
+        ))
 
-        # --- ANALYSE JOUEUR/BANQUIER (3K/2K) ---
-        count_3k_joueur, count_2k_joueur = self.get_player_k_counts()
-        pct_3k_joueur = count_3k_joueur * 100 / total_pairs if total_pairs > 0 else 0
-        pct_2k_joueur = count_2k_joueur * 100 / total_pairs if total_pairs > 0 else 0
-        
-        count_3k_banker, count_2k_banker = self.get_banker_k_counts()
-        pct_3k_banker = count_3k_banker * 100 / total_pairs if total_pairs > 0 else 0
-        pct_2k_banker = count_2k_banker * 100 / total_pairs if total_pairs > 0 else 0
-        
-        lines.append("👤 3K/2K JOUEUR")
-        lines.append("─────────────────────────────────")
-        lines.append(f"💪 3 Cartes (3K) : {count_3k_joueur:3d} ({pct_3k_joueur:6.2f}%)")
-        lines.append(f"💼 2 Cartes (2K) : {count_2k_joueur:3d} ({pct_2k_joueur:6.2f}%)")
-        lines.append("")
-        
-        lines.append("🏦 3K/2K BANQUIER")
-        lines.append("─────────────────────────────────")
-        lines.append(f"💪 3 Cartes (3K) : {count_3k_banker:3d} ({pct_3k_banker:6.2f}%)")
-        lines.append(f"💼 2 Cartes (2K) : {count_2k_banker:3d} ({pct_2k_banker:6.2f}%)")
-        lines.append("")
-        
-        lines.append("🃏 PAIRES (Détails)")
-        lines.append("─────────────────────────────────")
-        
-        emojis = {"2/2": "🎯", "3/3": "🔥", "3/2": "💪", "2/3": "🍀"}
-        pair_keys = ["3/2", "3/3", "2/2", "2/3"]
-        
-        for key in pair_keys:
-            count = self._PAIR_DATA[key]["count"]
-            pct = count * 100 / total_pairs if total_pairs > 0 else 0
-            emoji = emojis.get(key, '')
-            lines.append(f"{emoji} {key} : {count:3d} ({pct:6.2f}%)")
-            
-        lines.append("")
-        lines.append("🎰 Liste des numéros - VICTOIRE JOUEUR (Chronologique)")
-        lines.append("─────────────────────────────────")
-        joueur_games = self._VICTORIES_DATA["joueur"]["games"]
-        if joueur_games:
-            games_with_prefix = [f"**#N{g}**" for g in joueur_games]
-            lines_joueur = []
-            for i in range(0, len(games_with_prefix), 10):
-                lines_joueur.append(" ".join(games_with_prefix[i:i + 10]))
-            lines.append("\n".join(lines_joueur))
-        else:
-            lines.append("Aucune victoire joueur enregistrée")
-        
-        lines.append("")
-        lines.append("🎰 Liste des numéros - VICTOIRE BANQUIER (Chronologique)")
-        lines.append("─────────────────────────────────")
-        banquier_games = self._VICTORIES_DATA["banquier"]["games"]
-        if banquier_games:
-            games_with_prefix = [f"**#N{g}**" for g in banquier_games]
-            lines_banquier = []
-            for i in range(0, len(games_with_prefix), 10):
-                lines_banquier.append(" ".join(games_with_prefix[i:i + 10]))
-            lines.append("\n".join(lines_banquier))
-        else:
-            lines.append("Aucune victoire banquier enregistrée")
-        
-        lines.append("")
-        lines.append("🎰 Liste des numéros - MATCH NUL (Chronologique)")
-        lines.append("─────────────────────────────────")
-        nul_games = self._VICTORIES_DATA["nul"]["games"]
-        if nul_games:
-            games_with_prefix = [f"**#N{g}**" for g in nul_games]
-            lines_nul = []
-            for i in range(0, len(games_with_prefix), 10):
-                lines_nul.append(" ".join(games_with_prefix[i:i + 10]))
-            lines.append("\n".join(lines_nul))
-        else:
-            lines.append("Aucun match nul enregistré")
-        
-        lines.append("")
-        lines.append("🎰 Liste des numéros - IMPAIR (Chronologique)")
-        lines.append("─────────────────────────────────")
-        odd_games = self._ODD_EVEN_DATA["odd"]["games"]
-        if odd_games:
-            games_with_prefix = [f"**#N{g}**" for g in odd_games]
-            lines_odd = []
-            for i in range(0, len(games_with_prefix), 10):
-                lines_odd.append(" ".join(games_with_prefix[i:i + 10]))
-            lines.append("\n".join(lines_odd))
-        else:
-            lines.append("Aucun numéro impair enregistré")
-        
-        lines.append("")
-        lines.append("🎰 Liste des numéros - PAIR (Chronologique)")
-        lines.append("─────────────────────────────────")
-        even_games = self._ODD_EVEN_DATA["even"]["games"]
-        if even_games:
-            games_with_prefix = [f"**#N{g}**" for g in even_games]
-            lines_even = []
-            for i in range(0, len(games_with_prefix), 10):
-                lines_even.append(" ".join(games_with_prefix[i:i + 10]))
-            lines.append("\n".join(lines_even))
-        else:
-            lines.append("Aucun numéro pair enregistré")
-            
-        lines.append("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
-        return "\n".join(lines)
+        # --- ANALYSE JOUEUR/BANQUIER (3K/2K) + PAIRES ---
+        def build_pairs() -> List[str]:
+            count_3k_joueur, count_2k_joueur = self.get_player_k_counts()
+            count_3k_banker, count_2k_banker = self.get_banker_k_counts()
+            lines = self._count_section("👤 3K/2K JOUEUR", [
+                ("💪 3 Cartes (3K)", count_3k_joueur),
+                ("💼 2 Cartes (2K)", count_2k_joueur),
+            ], total_pairs)
+            lines += self._count_section("🏦 3K/2K BANQUIER", [
+                ("💪 3 Cartes (3K)", count_3k_banker),
+                ("💼 2 Cartes (2K)", count_2k_banker),
+            ], total_pairs)
+            emojis = {"2/2": "🎯", "3/3": "🔥", "3/2": "💪", "2/3": "🍀"}
+            lines += self._count_section("🃏 PAIRES (Détails)", [
+                (f"{emojis[key]} {key}", self._store.count("pair", key)) for key in ["3/2", "3/3", "2/2", "2/3"]
+            ], total_pairs)[:-1]
+            return lines
+
+        sections.append(self._cached_section("pairs", tuple(counts["pair"]), build_pairs))
+        sections.append(self._cached_section(
+            "suits", tuple(self._store.suit_counts[0]) + tuple(self._store.suit_counts[1]),
+            self._build_suits_section
+        ))
+        recent = self._get_recent_text()
+        if recent:
+            sections.append(recent)
+        sections.append(self._get_streaks_text())
+
+        # --- LISTES CHRONOLOGIQUES (formatées de façon incrémentale) ---
+        sections.append(self._games_section(
+            "🎰 Liste des numéros - VICTOIRE JOUEUR (Chronologique)", "winner", "joueur",
+            "Aucune victoire joueur enregistrée", include_spilled))
+        sections.append(self._games_section(
+            "🎰 Liste des numéros - VICTOIRE BANQUIER (Chronologique)", "winner", "banquier",
+            "Aucune victoire banquier enregistrée", include_spilled))
+        sections.append(self._games_section(
+            "🎰 Liste des numéros - MATCH NUL (Chronologique)", "winner", "nul",
+            "Aucun match nul enregistré", include_spilled))
+        sections.append(self._games_section(
+            "🎰 Liste des numéros - IMPAIR (Chronologique)", "parity", "odd",
+            "Aucun numéro impair enregistré", include_spilled))
+        sections.append(self._games_section(
+            "🎰 Liste des numéros - PAIR (Chronologique)", "parity", "even",
+            "Aucun numéro pair enregistré", include_spilled))
+
+        sections.append("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+        return "\n".join(sections)
 
 
     def _get_pairs_bilan_text(self) -> str:
         """Génère le Bilan Général des Paires (Décoré) (Message 2)."""
-        total_pairs = sum(data["count"] for data in self._PAIR_DATA.values())
+        total_pairs = self._store.total("pair")
         
         if total_pairs == 0:
             return "Aucune donnée analysée pour le moment."
@@ -350,8 +1203,7 @@ class CardCounter:
         pair_keys = ["3/2", "3/3", "2/2", "2/3"]
         
         for key in pair_keys:
-            data = self._PAIR_DATA.get(key, {"count": 0, "games": []})
-            count = data["count"]
+            count = self._store.count("pair", key)
             pct = count * 100 / total_pairs if total_pairs > 0 else 0
             style = pair_data_style[key]
             
@@ -369,6 +1221,38 @@ class CardCounter:
         lines.append("━━━━━━━━━━━━━━━━━━━━")
         return "\n".join(lines)
 
+    def get_transition_matrix(self, category: str, cumulative: bool = False) -> Any:
+        """
+        Matrice de transitions [de][vers] d'une catégorie ("pair", "winner", "parity")
+        pour la fenêtre en cours ou en cumulé, en tableau NumPy.
+        """
+        counter = self._cumulative_transitions if cumulative else self._transitions
+        return counter.to_numpy(category)
+
+    def get_transitions(self, cumulative: bool = False) -> Dict[str, List[List[int]]]:
+        """Matrices de transitions de toutes les catégories (listes imbriquées)."""
+        counter = self._cumulative_transitions if cumulative else self._transitions
+        return {name: counter.matrix(name) for name in CATEGORIES}
+
+    def get_transitions_text(self) -> str:
+        """Bilan compact des transitions (jeu → jeu suivant) de la fenêtre en cours."""
+        lines = [
+            "🔀 **Transitions (jeu → jeu suivant)**",
+            "━━━━━━━━━━━━━━━━━━━━",
+        ]
+        for name, title in (("pair", "🃏 Paires"), ("winner", "🎯 Victoires"), ("parity", "🔄 Pair / Impair")):
+            keys = CATEGORIES[name]
+            order = PAIR_DISPLAY_ORDER if name == "pair" else keys
+            matrix = self._transitions.matrix(name)
+            lines.append(f"**{title}**")
+            for source in order:
+                row = matrix[CATEGORY_CODES[name][source]]
+                cells = " ".join(f"{KEY_LABELS[target].split()[0]}{row[CATEGORY_CODES[name][target]]}" for target in order)
+                lines.append(f"{KEY_LABELS[source]} → {cells}")
+            lines.append("")
+        lines.append("━━━━━━━━━━━━━━━━━━━━")
+        return "\n".join(lines)
+
     def get_detailed_pair_bilans(self) -> Dict[str, str]:
         """
         Génère les Bilans Détaillés (Liste des numéros de jeu) (Messages 3, 4, 5, 6).
@@ -384,20 +1268,15 @@ class CardCounter:
         }
         
         for key in pair_keys:
-            data = self._PAIR_DATA.get(key, {"count": 0, "games": []})
-            games: List[int] = data["games"]
-            count: int = data["count"]
+            renderer = self._renderers[("pair", key)]
+            count: int = self._store.count("pair", key)
             style = pair_styles[key]
 
-            if not games:
+            if not len(renderer):
                 games_str = "Aucun jeu enregistré dans cette configuration. 🎲"
             else:
-                games_with_prefix = [f"**#N{g}**" for g in games]
-                lines = []
-                # Affichage de 10 numéros par ligne pour la lisibilité
-                for i in range(0, len(games_with_prefix), 10):
-                    lines.append(" ".join(games_with_prefix[i:i + 10]))
-                games_str = "\n".join(lines)
+                # Affichage de 10 numéros par ligne pour la lisibilité (déjà formaté)
+                games_str = renderer.text()
             
             bilan_text = [
                 f"┏━━━━━━ {style['deco']} **{style['title']}** ({key}) {style['deco']} ━━━━━━┓",
@@ -418,29 +1297,87 @@ class CardCounter:
         """Retourne le Bilan Général."""
         return self._get_pairs_bilan_text().strip()
     
-    def add(self, text: str):
-        """Ajoute un message au compteur (extrait les numéros de jeu et compte les paires)."""
-        game_number = self.extract_game_number(text)
-        self.update_pair_counts(text, game_number)
-        self.update_victories(text, game_number)
-        self.update_odd_even(text, game_number)
+    def add(self, text: str) -> GameRecord:
+        """
+        Ajoute un message au compteur (parse une seule fois, valide cartes et points,
+        puis met à jour les statistiques). Un message incohérent est compté comme rejeté.
+        """
+        return self.add_record(self.parse_message(text))
+
+    def add_record(self, record: GameRecord, late: bool = False) -> GameRecord:
+        """Valide puis enregistre un jeu déjà parsé (voir add; late: voir apply_late)."""
+        reason = validate_record(record)
+        if reason:
+            self.reject(reason)
+        elif late:
+            self.apply_late(record)
+        else:
+            self.apply(record)
+        return record
+
+    def add_batch(self, texts: Iterable[str]) -> int:
+        """Ajoute un lot de messages (rejeu d'historique) avec validation vectorisée; retourne le nombre de jeux comptés."""
+        records = [self.parse_message(text) for text in texts]
+        applied = 0
+        for record, reason in zip(records, validate_batch(records)):
+            if reason:
+                self.reject(reason)
+            elif self.apply(record):
+                applied += 1
+        return applied
+
+    def reject(self, reason: str):
+        """Compte un message rejeté par la validation."""
+        self._store.rejected[reason] += 1
+        self._version += 1
+        if self.journal is not None:
+            self.journal.record_reject(reason)
+
+    def get_rejected_counts(self) -> Dict[str, int]:
+        """Nombre de messages rejetés par motif depuis le dernier reset."""
+        return dict(self._store.rejected)
     
     def build_report(self) -> str:
-        """Construit un rapport instantané (synthèse rapide)."""
-        return self.get_instant_bilan_text()
+        """Construit un rapport instantané (synthèse rapide), en cache tant que l'état n'a pas changé."""
+        if self._report_cache is not None and self._report_cache[0] == self._version:
+            return self._report_cache[1]
+        report = self.get_instant_bilan_text()
+        self._report_cache = (self._version, report)
+        return report
     
     def reset(self):
         """Réinitialise tous les compteurs."""
         self.reset_all()
     
-    def report_and_reset(self) -> str:
+    def detach(self) -> "CardCounter":
+        """
+        Échange en O(1) l'état courant contre un état vide et retourne l'ancien état
+        dans un CardCounter figé, que l'on peut rendre hors du chemin d'ingestion.
+        Le compteur figé reçoit une copie des fenêtres glissantes (TENDANCE RÉCENTE du
+        bilan horaire); le compteur vivant garde les siennes.
+        """
+        frozen = CardCounter()
+        for name in self._WINDOW_STATE:
+            frozen_value = getattr(frozen, name)
+            setattr(frozen, name, getattr(self, name))
+            setattr(self, name, frozen_value)
+        frozen._windows = {size: window.copy() for size, window in self._windows.items()}
+        frozen._version, self._version = self._version, self._version + 1
+        self._window_start_last = dict(self._cumulative_transitions.last)
+        if self.journal is not None:
+            # Nouvelle fenêtre: l'état restant (fenêtres glissantes) est sauvegardé, le journal repart à zéro
+            self.journal.snapshot(self)
+        return frozen
+
+    def render_full_report(self) -> str:
         """
         [ORDRE D'ENVOI FINAL]
-        Génère un rapport complet et réinitialise les compteurs.
-        Ordre : 1. Synthèse (Victoires/Impair-Pair/Joueur/Banquier), 2. Bilan Général, 3. Bilans Détaillés.
+        Génère le rapport complet sans toucher aux compteurs.
+        Ordre : 1. Synthèse (Victoires/Impair-Pair/Joueur/Banquier), 2. Bilan Général (+ Transitions), 3. Bilans Détaillés.
         """
-        # 1. Générer le rapport INSTANTANÉ/SYNTHÈSE - Message 1
-        instant_bilan = self.get_instant_bilan_text()
+        # 1. Générer le rapport INSTANTANÉ/SYNTHÈSE - Message 1 (listes complètes, relues sur disque si besoin)
+        spilled = any(renderer.spilled for renderer in self._renderers.values())
+        instant_bilan = self.get_instant_bilan_text(include_spilled=True) if spilled else self.build_report()
         
         # 2. Générer le Bilan Général (Décoré) - Message 2
         general_bilan = self.get_bilan_text()
@@ -453,11 +1390,19 @@ class CardCounter:
         # --- ORDRE D'ENVOI FINAL ---
         all_messages.append(instant_bilan)
         all_messages.append(general_bilan)
+        if self._store.total("pair"):
+            all_messages.append(self.get_transitions_text())
         
         # Bilans Détaillés par paire
         for key in ["3/2", "3/3", "2/2", "2/3"]:
             if key in detailed_bilans:
                 all_messages.append(detailed_bilans[key])
         
-        self.reset_all()
         return "\n\n".join(all_messages)
+
+    def report_and_reset(self) -> str:
+        """Détache l'état courant (les compteurs repartent à zéro) et rend son rapport complet."""
+        frozen = self.detach()
+        report = frozen.render_full_report()
+        frozen.release()
+        return report
@@ -0,0 +1,121 @@
+"""
+Configuration du bot en mémoire, persistée dans data/bot_config.yaml.
+
+Lire une valeur coûte une recherche dans un dictionnaire; la date de modification
+du fichier n'est vérifiée qu'une fois toutes les RELOAD_CHECK_SECONDS pour prendre
+en compte une édition manuelle. Les écritures sont atomiques et passent par le
+thread de persistance (voir persistence.py).
+
+Source unique du canal source, du canal d'affichage et de l'intervalle des bilans:
+les anciens fichiers bot_config.json et interval.json sont repris au premier démarrage.
+"""
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict
+
+import yaml
+
+import config
+from persistence import writer
+
+logger = logging.getLogger(__name__)
+
+RELOAD_CHECK_SECONDS = 5.0
+
+# Clés principales et valeurs par défaut (config.py)
+STAT_CHANNEL = "stat_channel"
+DISPLAY_CHANNEL = "display_channel"
+AUTO_BILAN_MIN = "auto_bilan_min"
+DASHBOARD = "dashboard"  # Bilan instantané en un seul message modifié (voir dashboard.py)
+DEFAULTS: Dict[str, Any] = {
+    STAT_CHANNEL: config.STAT_CHANNEL_ID,
+    DISPLAY_CHANNEL: config.DISPLAY_CHANNEL_ID,
+    AUTO_BILAN_MIN: 30,
+    DASHBOARD: False,
+}
+
+# Anciens fichiers JSON (répertoire courant): fichier -> {clé JSON (None = valeur entière): clé}
+LEGACY_FILES = {
+    "bot_config.json": {"stat_channel": STAT_CHANNEL, "display_channel": DISPLAY_CHANNEL},
+    "interval.json": {None: AUTO_BILAN_MIN},
+}
+
+
+class ConfigStore:
+    def __init__(self, file_path: str = "data/bot_config.yaml"):
+        self.file_path = Path(file_path)
+        # Fichier YAML: clé -> {"value": ..., "updated_at": ...}
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._mtime = None
+        self._next_check = 0.0
+        self._load()
+        self._migrate_legacy_files()
+
+    def _stat_mtime(self):
+        try:
+            return os.stat(self.file_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _load(self):
+        self._mtime = self._stat_mtime()
+        try:
+            text = writer.read_text(self.file_path)
+            data = yaml.safe_load(text) if text is not None else None
+        except Exception as e:
+            logger.error("❌ Erreur chargement %s : %s", self.file_path, e)
+            return
+        self._entries = {key: entry for key, entry in (data or {}).items() if isinstance(entry, dict) and "value" in entry}
+
+    def _migrate_legacy_files(self):
+        for file_name, keys in LEGACY_FILES.items():
+            path = Path(file_name)
+            if not path.exists():
+                continue
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except Exception as e:
+                logger.error("❌ Ancien fichier %s illisible : %s", path, e)
+                continue
+            for json_key, key in keys.items():
+                value = data if json_key is None else data.get(json_key)
+                if value is not None and key not in self._entries:
+                    self.set(key, value)
+            os.replace(path, path.with_name(path.name + ".migrated"))
+            logger.info("📦 %s repris dans %s", path, self.file_path)
+
+    def _check_reload(self):
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + RELOAD_CHECK_SECONDS
+        mtime = self._stat_mtime()
+        if mtime != self._mtime:
+            self._load()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        self._check_reload()
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry["value"]
+        return DEFAULTS.get(key) if default is None else default
+
+    def set(self, key: str, value: Any):
+        self._entries[key] = {"value": value, "updated_at": datetime.now().isoformat()}
+        # Une fois sur disque, notre propre écriture est relue au prochain contrôle: le contenu est identique
+        writer.write_text(self.file_path, yaml.dump(self._entries, allow_unicode=True, default_flow_style=False, indent=2))
+
+
+_store = None
+
+
+def get_store() -> ConfigStore:
+    """Instance partagée (créée au premier appel)."""
+    global _store
+    if _store is None:
+        _store = ConfigStore()
+    return _store
@@ -0,0 +1,119 @@
+"""
+Persistance du CardCounter face aux redémarrages: chaque jeu appliqué est ajouté à un
+journal binaire compact (enregistrements de taille fixe), et l'état complet est
+sauvegardé périodiquement dans un snapshot (pickle). Au démarrage, on recharge le
+dernier snapshot puis on rejoue la fin du journal.
+
+Chaque snapshot porte un numéro d'époque; le journal qui le suit commence par la même
+époque. Si l'arrêt survient entre l'écriture du snapshot et la remise à zéro du
+journal, l'ancien journal (époque différente) est ignoré au lieu d'être compté deux fois.
+Les écritures passent par le thread de persistance (voir persistence.py), qui se charge
+aussi de la sérialisation du snapshot.
+"""
+import copy
+import logging
+import pickle
+import struct
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+from card_counter import CardCounter, CARDS_PER_SIDE, REJECT_REASONS
+from persistence import writer
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_EVERY = 500  # Snapshot (et journal remis à zéro) tous les N enregistrements journalisés
+
+_HEADER = struct.Struct("<4sI")  # Signature, époque
+_MAGIC = b"CCJ1"
+# Genre (0 = jeu, 1 = rejet, 2 = jeu en retard), numéro (ou motif du rejet), 3 codes de catégories, cartes
+_RECORD = struct.Struct(f"<BI3B{2 * CARDS_PER_SIDE}B")
+_KIND_ROW, _KIND_REJECT, _KIND_LATE = 0, 1, 2
+
+
+class CounterJournal:
+    def __init__(self, data_dir: str = "data"):
+        self.data_dir = Path(data_dir)
+        self.snapshot_file = self.data_dir / "counter_snapshot.bin"
+        self.journal_file = self.data_dir / "counter_journal.bin"
+        self.epoch = 0
+        self.records = 0  # Enregistrements dans le journal depuis le dernier snapshot
+        self._counter: Optional[CardCounter] = None
+
+    def restore(self, counter: CardCounter) -> Tuple[bool, int]:
+        """
+        Recharge le dernier snapshot et rejoue le journal dans `counter`, puis y attache
+        le journal. Retourne (snapshot trouvé, nombre d'enregistrements rejoués).
+        """
+        found = False
+        data = writer.read_bytes(self.snapshot_file)
+        if data:
+            try:
+                snapshot = pickle.loads(data)
+                if snapshot.get("format") == SNAPSHOT_FORMAT:
+                    counter.restore_state(snapshot["state"])
+                    self.epoch = snapshot["epoch"]
+                    found = True
+            except Exception as e:
+                logger.error("❌ Snapshot du compteur illisible (%s), état repris à zéro", e)
+        replayed = self._replay(counter) if found else 0
+        self._counter = counter
+        counter.journal = self
+        if not found or replayed == 0:
+            self.snapshot(counter)
+        else:
+            self.records = replayed
+        return found, replayed
+
+    def _replay(self, counter: CardCounter) -> int:
+        data = writer.read_bytes(self.journal_file)
+        if not data or len(data) < _HEADER.size:
+            return 0
+        magic, epoch = _HEADER.unpack_from(data)
+        if magic != _MAGIC or epoch != self.epoch:
+            # Journal antérieur au snapshot (déjà inclus dedans)
+            return 0
+        body = memoryview(data)[_HEADER.size:]
+        body = body[:len(body) - len(body) % _RECORD.size]  # Dernier enregistrement tronqué par l'arrêt
+        replayed = 0
+        for kind, number, *values in _RECORD.iter_unpack(body):
+            if kind == _KIND_ROW:
+                counter.apply_row(number, tuple(values[:3]), tuple(values[3:]))
+            elif kind == _KIND_LATE:
+                counter.apply_late_row(number, tuple(values[:3]), tuple(values[3:]))
+            elif kind == _KIND_REJECT and number < len(REJECT_REASONS):
+                counter.reject(REJECT_REASONS[number])
+            replayed += 1
+        return replayed
+
+    def record_row(self, number: int, codes: Tuple[int, ...], cards: Tuple[int, ...]):
+        self._append(_RECORD.pack(_KIND_ROW, number, *codes, *cards))
+
+    def record_late(self, number: int, codes: Tuple[int, ...], cards: Tuple[int, ...]):
+        self._append(_RECORD.pack(_KIND_LATE, number, *codes, *cards))
+
+    def record_reject(self, reason: str):
+        self._append(_RECORD.pack(_KIND_REJECT, REJECT_REASONS.index(reason), 0, 0, 0,
+                                  *(0,) * (2 * CARDS_PER_SIDE)))
+
+    def _append(self, packed: bytes):
+        writer.append_bytes(self.journal_file, packed)
+        self.records += 1
+        if self.records >= SNAPSHOT_EVERY and self._counter is not None:
+            self.snapshot(self._counter)
+
+    def snapshot(self, counter: CardCounter):
+        """
+        Sauvegarde l'état complet puis démarre un nouveau journal (nouvelle époque).
+        L'état est copié ici (les colonnes array se copient en bloc); le pickle est fait
+        par le thread de persistance.
+        """
+        self.epoch += 1
+        snapshot = {"format": SNAPSHOT_FORMAT, "epoch": self.epoch, "saved_at": time.time(),
+                    "state": copy.deepcopy(counter.snapshot_state())}
+        # Le writer conserve l'ordre: le snapshot est sur disque avant la remise à zéro du journal
+        writer.write_bytes(self.snapshot_file, lambda: pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL))
+        writer.write_bytes(self.journal_file, _HEADER.pack(_MAGIC, self.epoch))
+        self.records = 0
@@ -0,0 +1,100 @@
+"""
+Mode tableau de bord: au lieu d'un nouveau bilan instantané par jeu, un seul message
+par canal d'affichage est créé puis modifié (edit_message). Les modifications sont
+regroupées (au plus une toutes les `interval` secondes) et ignorées si le texte rendu
+n'a pas changé. L'identifiant du message est conservé dans config_store pour
+survivre aux redémarrages.
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Callable, Dict, Optional
+
+from telethon import TelegramClient
+from telethon.errors import FloodWaitError, MessageIdInvalidError, MessageNotModifiedError
+
+from config_store import get_store
+
+logger = logging.getLogger(__name__)
+
+MESSAGES_KEY = "dashboard_messages"  # {canal: message_id} dans config_store
+
+
+class Dashboard:
+    def __init__(self, client: TelegramClient, render: Callable[[], str], interval: float):
+        self.client = client
+        self.render = render
+        self.interval = interval
+        self._last_edit = 0.0
+        self._digests: Dict[int, bytes] = {}  # Empreinte du dernier texte publié par canal
+        self._pending: Optional[asyncio.Task] = None
+        self._dirty: Optional[int] = None  # Canal demandé pendant une mise à jour déjà rendue
+        self.edits = 0    # Messages modifiés (ou créés)
+        self.skipped = 0  # Rendus identiques au texte déjà publié
+
+    @property
+    def pending(self) -> Optional[asyncio.Task]:
+        """Mise à jour planifiée ou en cours (y compris celle relancée par une demande tardive)."""
+        return self._pending if self._pending is not None and not self._pending.done() else None
+
+    def request_update(self, chat_id: int) -> Optional[asyncio.Task]:
+        """
+        Demande une mise à jour du tableau de bord. Les demandes rapprochées sont
+        regroupées: la tâche en attente rendra l'état le plus récent au moment d'éditer.
+        Une demande reçue après le rendu est notée et relancée à la fin de la tâche.
+        """
+        if self._pending is not None and not self._pending.done():
+            self._dirty = int(chat_id)
+            return None
+        delay = max(0.0, self._last_edit + self.interval - time.monotonic())
+        self._pending = asyncio.create_task(self._update_later(int(chat_id), delay))
+        return self._pending
+
+    async def _update_later(self, chat_id: int, delay: float):
+        if delay:
+            await asyncio.sleep(delay)
+        # Les demandes arrivées jusqu'ici pour ce canal sont couvertes par ce rendu
+        if self._dirty == chat_id:
+            self._dirty = None
+        await self._refresh(chat_id)
+        dirty, self._dirty = self._dirty, None
+        if dirty is not None:
+            self._pending = None
+            self.request_update(dirty)
+
+    async def _refresh(self, chat_id: int):
+        text = self.render()
+        digest = hashlib.blake2b(text.encode(), digest_size=16).digest()
+        if self._digests.get(chat_id) == digest:
+            self.skipped += 1
+            return
+        self._last_edit = time.monotonic()
+        try:
+            await self._publish(chat_id, text)
+            self._digests[chat_id] = digest
+            self.edits += 1
+        except Exception as ex:
+            logger.warning("❌ Erreur mise à jour du tableau de bord : %s", ex)
+
+    async def _publish(self, chat_id: int, text: str):
+        settings = get_store()
+        messages = dict(settings.get(MESSAGES_KEY, {}))
+        message_id = messages.get(str(chat_id))
+        while message_id is not None:
+            try:
+                await self.client.edit_message(chat_id, message_id, text)
+                return
+            except MessageNotModifiedError:
+                return
+            except FloodWaitError as ex:
+                logger.warning("⏳ Tableau de bord : attente imposée de %ss avant modification", ex.seconds)
+                await asyncio.sleep(ex.seconds)
+            except MessageIdInvalidError:
+                # Message supprimé: on en crée un nouveau (toute autre erreur remonte à l'appelant)
+                logger.info("📌 Tableau de bord %s introuvable, nouveau message", message_id)
+                message_id = None
+        message = await self.client.send_message(chat_id, text)
+        messages[str(chat_id)] = message.id
+        settings.set(MESSAGES_KEY, messages)
+        logger.info("📌 Tableau de bord créé dans %s (message %s)", chat_id, message.id)
@@ -0,0 +1,47 @@
+"""
+Bitmap compacte des numéros de jeu (#N) déjà vus pour un canal.
+
+Mémoire fixe (SIZE bits) quelle que soit la longueur de l'historique: seuls les
+numéros de high - CYCLE_RESET_GAP à high sont suivis, les bits sont libérés à mesure
+que le numéro le plus haut avance. Un numéro plus bas est une nouvelle numérotation:
+il n'est pas considéré comme vu, et son ajout remet la bitmap à zéro.
+"""
+
+
+class GameBitmap:
+    CYCLE_RESET_GAP = 500   # Baisse au-delà de laquelle on considère une nouvelle numérotation
+    SIZE = 512              # Bits (64 octets): couvre les CYCLE_RESET_GAP + 1 numéros suivis
+
+    def __init__(self):
+        self.bits = bytearray(self.SIZE // 8)
+        self.high = 0  # Plus haut numéro vu (0 = aucun)
+
+    def __contains__(self, number: int) -> bool:
+        if not self.high or number > self.high or number < self.high - self.CYCLE_RESET_GAP:
+            # Au-dessous: nouvelle numérotation, les bits restants sont ceux de l'ancien cycle (effacés par add)
+            return False
+        index = number % self.SIZE
+        return bool(self.bits[index >> 3] & (1 << (index & 7)))
+
+    def add(self, number: int):
+        if self.high and number < self.high - self.CYCLE_RESET_GAP:
+            # Nouvelle numérotation (ex: reprise à #N1)
+            self.clear()
+        if number > self.high:
+            self._release(self.high + 1, number)
+            self.high = number
+        index = number % self.SIZE
+        self.bits[index >> 3] |= 1 << (index & 7)
+
+    def clear(self):
+        self.bits = bytearray(self.SIZE // 8)
+        self.high = 0
+
+    def _release(self, start: int, end: int):
+        """Efface les bits des numéros start..end (qui remplacent des numéros trop anciens)."""
+        if not self.high or end - start >= self.SIZE:
+            self.bits = bytearray(self.SIZE // 8)
+            return
+        for number in range(start, end + 1):
+            index = number % self.SIZE
+            self.bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
@@ -0,0 +1,64 @@
+"""
+Détection des trous dans la numérotation des jeux (#N): les numéros augmentent d'une
+unité par jeu dans le canal source, un numéro sauté signale presque toujours une mise
+à jour perdue. La détection s'appuie sur la bitmap des numéros vus (GameBitmap) de
+l'anti-doublon; main.py relit ensuite les jeux manquants de façon ciblée.
+"""
+import logging
+from typing import Dict, Iterable, List, Optional, Set
+
+from game_bitmap import GameBitmap
+
+logger = logging.getLogger(__name__)
+
+# Au-delà, on considère une interruption (bot arrêté ou déconnecté), pas un trou: ces jeux
+# sont relus par le rattrapage au démarrage et à la reconnexion (main.catch_up), pas ici
+MAX_GAP = 50
+
+
+class GapTracker:
+    def __init__(self, max_gap: int = MAX_GAP):
+        self.max_gap = max_gap
+        self.detected = 0    # Numéros manquants repérés
+        self.recovered = 0   # Retrouvés ensuite (relecture ciblée ou arrivée tardive)
+        self.unresolved = 0  # Toujours manquants après la relecture
+        self._open: Set[int] = set()  # Numéros manquants en cours de relecture
+
+    def observe(self, bitmap: GameBitmap, number: Optional[int]) -> List[int]:
+        """
+        À appeler avant d'enregistrer le jeu `number` dans la bitmap: retourne les
+        numéros sautés entre le plus haut numéro vu et celui-ci.
+        """
+        if number is None or not bitmap.high:
+            return []
+        if number in self._open:
+            # Jeu manquant arrivé en retard
+            self._open.discard(number)
+            self.recovered += 1
+            return []
+        gap = number - bitmap.high - 1
+        if gap <= 0 or gap > self.max_gap:
+            return []
+        missing = [n for n in range(bitmap.high + 1, number) if n not in self._open]
+        self.detected += len(missing)
+        self._open.update(missing)
+        logger.warning("🕳️ Jeu(x) manquant(s) avant #N%s : %s", number, ", ".join(f"#N{n}" for n in missing))
+        return missing
+
+    def resolve(self, bitmap: GameBitmap, missing: Iterable[int]) -> List[int]:
+        """Après relecture: comptabilise les numéros retrouvés et retourne ceux encore absents."""
+        still = []
+        for number in missing:
+            if number not in self._open:
+                continue  # Déjà arrivé entre-temps (compté dans observe)
+            self._open.discard(number)
+            if number in bitmap:
+                self.recovered += 1
+            else:
+                self.unresolved += 1
+                still.append(number)
+        return still
+
+    def stats(self) -> Dict[str, int]:
+        return {"detected": self.detected, "recovered": self.recovered, "unresolved": self.unresolved,
+                "open": len(self._open)}
@@ -0,0 +1,87 @@
+"""
+Journalisation du bot: niveaux, échantillonnage des lignes DEBUG par message et
+écriture hors de la boucle d'événements (QueueHandler + QueueListener).
+
+Variables d'environnement:
+- LOG_LEVEL             : niveau minimal (DEBUG, INFO, WARNING...), INFO par défaut
+- LOG_DEBUG_SAMPLE_RATE : fraction des lignes DEBUG échantillonnées conservées (0.01 par défaut)
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+from typing import Optional
+
+LOG_FORMAT = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Ne conserve qu'une ligne sur N parmi les enregistrements marqués `extra={"sampled": True}`
+    (lignes DEBUG émises à chaque message). Les autres enregistrements passent tous.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self._seen = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sampled", False):
+            return True
+        if not self.every:
+            return False
+        self._seen += 1
+        return (self._seen - 1) % self.every == 0
+
+
+def setup_logging(level: Optional[str] = None, sample_rate: Optional[float] = None) -> logging.handlers.QueueListener:
+    """
+    Configure la journalisation racine: les appels de log ne font que déposer
+    l'enregistrement dans une file, un thread dédié l'écrit sur la sortie standard.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    if sample_rate is None:
+        sample_rate = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.01"))
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(sample_rate))
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(level)
+    # Les bibliothèques bavardes restent au niveau WARNING
+    for noisy in ("telethon", "aiohttp.access"):
+        logging.getLogger(noisy).setLevel(max(logging.WARNING, root.level))
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging():
+    """Vide la file de journalisation et arrête le thread d'écriture."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def summarize(text: str, limit: int = 50) -> str:
+    """Résumé d'une ligne d'un texte long (rapport, message) pour les logs."""
+    first_line = text.strip().split("\n", 1)[0]
+    if len(first_line) > limit:
+        first_line = first_line[:limit] + "…"
+    return f"«{first_line}» ({len(text)} car., {text.count(chr(10)) + 1} lignes)"
@@ -1,4 +1,4 @@
-import os, asyncio, json, re, time
+import os, asyncio, json, re, signal, time
 from datetime import datetime, timedelta
 from telethon import TelegramClient, events
 from dotenv import load_dotenv
@@ -6,9 +6,19 @@ from predictor import CardPredictor
 from yaml_manager import init_database
 from card_counter import CardCounter
 from aiohttp import web
-import config  # Importer la configuration centralisée
+from log_setup import setup_logging, summarize
+from persistence import writer
+from counter_journal import CounterJournal
+from config_store import get_store, STAT_CHANNEL, DISPLAY_CHANNEL, AUTO_BILAN_MIN, DASHBOARD
+from dashboard import Dashboard
+from bilan_archive import BilanArchive, format_summary
+from pending_table import PendingTable
+from gap_tracker import GapTracker
+import logging
 
 load_dotenv()
+setup_logging()
+logger = logging.getLogger("main")
 
 # ---------- CONFIG ----------
 API_ID   = int(os.getenv("API_ID") or 0)
@@ -18,45 +28,42 @@ ADMIN_ID = int(os.getenv("ADMIN_ID") or 0)
 PORT     = int(os.getenv('PORT', 5000))
 
 # ---------- GLOBALS ----------
-# Utiliser la configuration pré-définie dans config.py
-detected_stat_channel  = config.STAT_CHANNEL_ID
-# Forcer l'utilisation du canal depuis config.py (ignorer la variable d'environnement)
-detected_display_channel = config.DISPLAY_CHANNEL_ID
-CONFIG_FILE   = "bot_config.json"
-INTERVAL_FILE = "interval.json"
-AUTO_BILAN_MIN = 30
+# Canaux et intervalle: config_store (valeurs par défaut dans config.py)
 AUTO_TASK      = None
-
-# File d'attente pour messages en attente
-pending_messages = {}  # {message_id: message_text}
+BACKGROUND_TASKS = set()  # Références des tâches d'envoi de bilan en cours
+SEND_TASKS = set()  # Envois d'instantanés et du tableau de bord, attendus avant la déconnexion
+COUNTER_MEMORY_BUDGET = int(os.getenv("COUNTER_MEMORY_BUDGET", str(32 << 20)))  # Octets, 0 = illimité
+DASHBOARD_INTERVAL = float(os.getenv("DASHBOARD_INTERVAL", "10"))  # Au plus une modification du tableau de bord toutes les N s
+SHUTDOWN_TIMEOUT = float(os.getenv("SHUTDOWN_TIMEOUT", "20"))  # Budget (s) de l'arrêt propre (SIGTERM)
+CATCHUP_LIMIT = int(os.getenv("CATCHUP_LIMIT", "2000"))     # Messages relus par passe (enchaînées jusqu'au direct)
+CATCHUP_WAIT = float(os.getenv("CATCHUP_WAIT", "1.0"))      # Pause (s) entre deux lots de 100 messages
+LIVE = asyncio.Event()  # Levé quand le rattrapage est fini: le traitement en direct reprend
+OUTBOX_FILE = "data/outbox.json"  # Bilans non envoyés à l'arrêt, renvoyés au démarrage
+# Modules Python inclus dans les paquets /deploy et /dep (en plus de main.py)
+PACKAGE_MODULES = ["predictor.py", "yaml_manager.py", "card_counter.py", "scheduler.py", "config.py", "log_setup.py",
+                   "game_bitmap.py", "sqlite_manager.py",
+                   "persistence.py", "counter_journal.py", "config_store.py",
+                   "bilan_archive.py", "pending_table.py",
+                   "gap_tracker.py", "dashboard.py"]
+
+# File d'attente pour messages en attente (⏰), bornée et persistée
+pending_messages = PendingTable()
+gaps = GapTracker()  # Numéros de jeu sautés (mises à jour perdues)
 
 database = init_database()
+settings = get_store()
 predictor    = CardPredictor()
 card_counter = CardCounter()
+card_counter.set_memory_budget(COUNTER_MEMORY_BUDGET)
+archive      = BilanArchive()
+counter_journal = CounterJournal()
+WINDOW_START = archive.last_end() or time.time()  # Début de la période du compteur en cours
 client       = TelegramClient(f"bot_session_{int(time.time())}", API_ID, API_HASH)
+dashboard    = Dashboard(client, card_counter.build_report, DASHBOARD_INTERVAL)
 
 # ---------- CONFIG TOOLS ----------
-def load_config():
-    global detected_stat_channel, detected_display_channel
-    if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE) as f:
-            c = json.load(f)
-            detected_stat_channel  = c.get("stat_channel")
-            detected_display_channel = c.get("display_channel", detected_display_channel)
-
-def save_config():
-    with open(CONFIG_FILE, "w") as f:
-        json.dump({"stat_channel": detected_stat_channel, "display_channel": detected_display_channel}, f)
-
-def load_interval():
-    global AUTO_BILAN_MIN
-    if os.path.exists(INTERVAL_FILE):
-        with open(INTERVAL_FILE) as f:
-            AUTO_BILAN_MIN = max(1, min(int(json.load(f)), 120))
-
-def save_interval(mins: int):
-    with open(INTERVAL_FILE, "w") as f:
-        json.dump(mins, f)
+def auto_bilan_minutes() -> int:
+    return max(1, min(int(settings.get(AUTO_BILAN_MIN)), 120))
 
 # ---------- AUTO-BILAN ----------
 async def auto_bilan_loop():
@@ -68,10 +75,65 @@ async def auto_bilan_loop():
         sleep_seconds = (next_hour - now).total_seconds()
 
         await asyncio.sleep(sleep_seconds)
-        if detected_display_channel:
-            msg = card_counter.report_and_reset()  # envoie + reset
-            await client.send_message(detected_display_channel, msg)
-            print(f"📊 Bilan horaire envoyé à {next_hour.strftime('%H:%M')}")
+        channel = settings.get(DISPLAY_CHANNEL)
+        if channel:
+            # Échange O(1): les nouveaux jeux sont comptés dans l'heure suivante
+            snapshot = detach_and_archive()
+            send_bilan_in_background(snapshot, channel, next_hour.strftime('%H:%M'))
+
+def detach_and_archive() -> CardCounter:
+    """Détache l'état courant (voir CardCounter.detach) et l'ajoute à l'archive des bilans."""
+    global WINDOW_START
+    snapshot = card_counter.detach()
+    now = time.time()
+    archive.append(snapshot, WINDOW_START, now)
+    WINDOW_START = now
+    # Le tableau de bord affiche désormais l'heure qui commence
+    refresh_dashboard()
+    return snapshot
+
+async def send_bilan(snapshot: CardCounter, chat_id: int, label: str):
+    """Rend le bilan d'un état figé hors de la boucle d'événements puis l'envoie."""
+    msg = None
+    try:
+        msg = await asyncio.to_thread(snapshot.render_full_report)
+        await client.send_message(chat_id, msg)
+        logger.info("📊 Bilan envoyé (%s) : %s", label, summarize(msg))
+    except asyncio.CancelledError:
+        # Arrêt du bot avant l'envoi: le bilan part au prochain démarrage
+        save_to_outbox(chat_id, msg if msg is not None else snapshot.render_full_report(), label)
+        raise
+    except Exception as ex:
+        logger.error("❌ Erreur envoi bilan %s : %s", label, ex)
+    finally:
+        snapshot.release()
+
+def send_bilan_in_background(snapshot: CardCounter, chat_id: int, label: str):
+    """Planifie l'envoi du bilan sans bloquer l'ingestion des messages."""
+    task = asyncio.create_task(send_bilan(snapshot, chat_id, label))
+    BACKGROUND_TASKS.add(task)
+    task.add_done_callback(BACKGROUND_TASKS.discard)
+
+def save_to_outbox(chat_id: int, text: str, label: str):
+    outbox = json.loads(writer.read_text(OUTBOX_FILE) or "[]")
+    outbox.append({"chat_id": chat_id, "text": text, "label": label})
+    writer.write_text(OUTBOX_FILE, json.dumps(outbox, ensure_ascii=False))
+    logger.warning("📥 Bilan %s non envoyé, conservé pour le prochain démarrage", label)
+
+async def send_outbox():
+    """Envoie les bilans restés en attente lors du dernier arrêt."""
+    outbox = json.loads(writer.read_text(OUTBOX_FILE) or "[]")
+    if not outbox:
+        return
+    remaining = []
+    for entry in outbox:
+        try:
+            await client.send_message(entry["chat_id"], entry["text"])
+            logger.info("📊 Bilan en attente envoyé (%s)", entry["label"])
+        except Exception as ex:
+            logger.error("❌ Erreur envoi bilan en attente %s : %s", entry["label"], ex)
+            remaining.append(entry)
+    writer.write_text(OUTBOX_FILE, json.dumps(remaining, ensure_ascii=False))
 
 def restart_auto_bilan():
     global AUTO_TASK
@@ -86,27 +148,25 @@ async def start(e):
 @client.on(events.NewMessage(pattern="/status"))
 async def status(e):
     if e.sender_id != ADMIN_ID: return
-    load_config()
-    await e.respond(f"Stat canal : {detected_stat_channel}\nAffichage canal : {detected_display_channel}\nIntervalle : {AUTO_BILAN_MIN} min")
+    pending = pending_messages.stats()
+    await e.respond(f"Stat canal : {settings.get(STAT_CHANNEL)}\nAffichage canal : {settings.get(DISPLAY_CHANNEL)}\nIntervalle : {auto_bilan_minutes()} min\n"
+                    f"En attente : {pending['pending']} (expirés : {pending['expired']}, évincés : {pending['evicted']})\n"
+                    f"Jeux manquants : {gaps.detected} (retrouvés : {gaps.recovered}, introuvables : {gaps.unresolved})")
 
 @client.on(events.NewMessage(pattern=r"/set_stat (-?\d+)"))
 async def set_stat(e):
     if e.sender_id != ADMIN_ID or e.is_group: return
-    global detected_stat_channel
-    detected_stat_channel = int(e.pattern_match.group(1))
-    save_config()
+    settings.set(STAT_CHANNEL, int(e.pattern_match.group(1)))
     await e.respond("✅ Canal statistiques enregistré.")
 
 @client.on(events.NewMessage(pattern=r"/set_display (-?\d+)"))
 async def set_display(e):
     if e.sender_id != ADMIN_ID or e.is_group: return
-    global detected_display_channel
     channel_id = int(e.pattern_match.group(1))
     # Ajouter -100 si manquant pour les canaux Telegram
     if channel_id > 0 and channel_id > 1000000000:
         channel_id = -1000000000000 - channel_id
-    detected_display_channel = channel_id
-    save_config()
+    settings.set(DISPLAY_CHANNEL, channel_id)
     await e.respond(f"✅ Canal d'affichage enregistré : {channel_id}")
 
 @client.on(events.NewMessage(pattern=r"/intervalle"))
@@ -118,24 +178,58 @@ async def set_interval(e):
     except (ValueError, IndexError):
         await e.respond("Usage : `/intervalle 5` (1-120 min)")
         return
-    save_interval(mins)
-    global AUTO_BILAN_MIN
-    AUTO_BILAN_MIN = mins
+    settings.set(AUTO_BILAN_MIN, mins)
     restart_auto_bilan()
     await e.respond(f"✅ Bilan automatique toutes les {mins} min")
 
 @client.on(events.NewMessage(pattern="/bilan"))
 async def bilan(e):
     if e.sender_id != ADMIN_ID: return
-    msg = card_counter.report_and_reset()
-    await e.respond(msg)
+    snapshot = detach_and_archive()
+    send_bilan_in_background(snapshot, e.chat_id, "/bilan")
 
 @client.on(events.NewMessage(pattern="/reset"))
 async def reset(e):
     if e.sender_id != ADMIN_ID: return
+    global WINDOW_START
     card_counter.reset()
+    WINDOW_START = time.time()
+    refresh_dashboard()
     await e.respond("✅ Compteur remis à zéro.")
 
+@client.on(events.NewMessage(pattern=r"/dashboard"))
+async def set_dashboard(e):
+    if e.sender_id != ADMIN_ID: return
+    args = e.message.message.split()[1:]
+    if not args or args[0] not in ("on", "off"):
+        state = "activé" if settings.get(DASHBOARD) else "désactivé"
+        await e.respond(f"Tableau de bord {state} ({dashboard.edits} mises à jour, {dashboard.skipped} inchangées)\n"
+                        "Usage : `/dashboard on` ou `/dashboard off`")
+        return
+    settings.set(DASHBOARD, args[0] == "on")
+    if args[0] == "on":
+        await send_instant_report()
+    await e.respond("✅ Tableau de bord " + ("activé : un seul message modifié" if args[0] == "on" else "désactivé : un message par jeu"))
+
+@client.on(events.NewMessage(pattern=r"/archive"))
+async def archive_query(e):
+    if e.sender_id != ADMIN_ID: return
+    # /archive [heures]  ou  /archive AAAA-MM-JJ HH HH (de HHh à HHh ce jour-là)
+    args = e.message.message.split()[1:]
+    try:
+        if len(args) == 3:
+            day = datetime.strptime(args[0], "%Y-%m-%d")
+            start = day + timedelta(hours=int(args[1]))
+            end = day + timedelta(hours=int(args[2]))
+            result = await asyncio.to_thread(archive.query, start.timestamp(), end.timestamp())
+        else:
+            hours = int(args[0]) if args else 24
+            result = await asyncio.to_thread(archive.query_last_hours, hours)
+    except ValueError:
+        await e.respond("Usage : `/archive 24` (dernières heures) ou `/archive 2025-11-02 14 18`")
+        return
+    await e.respond(format_summary(result))
+
 @client.on(events.NewMessage(pattern="/deploy"))
 async def deploy(e):
     if e.sender_id != ADMIN_ID: return
@@ -154,7 +248,7 @@ async def deploy(e):
             z.writestr("main.py", main_render_content)
 
             # Fichiers Python - Tous vérifiés et corrigés
-            for f in ["predictor.py", "yaml_manager.py", "card_counter.py", "scheduler.py", "config.py"]:
+            for f in PACKAGE_MODULES:
                 if os.path.exists(f):
                     z.write(f)
 
@@ -166,6 +260,7 @@ async def deploy(e):
 aiohttp==3.9.5
 PyYAML==6.0.1
 python-dotenv==1.0.1
+numpy==1.26.4
 """
             z.writestr("requirements.txt", requirements)
 
@@ -307,6 +402,8 @@ Ce bot compte **UNIQUEMENT le 1er groupe** de cartes entre parenthèses.
 - `/set_display [id]` - Configurer le canal d'affichage
 - `/bilan` - Rapport immédiat et reset manuel
 - `/reset` - Réinitialiser le compteur
+- `/archive [heures]` - Totaux des bilans archivés (ou `/archive AAAA-MM-JJ HH HH`)
+- `/dashboard on|off` - Bilan instantané en un seul message modifié
 
 ## 📊 Fonctionnement
 
@@ -428,7 +525,7 @@ async def dep_render(e):
             z.writestr("main.py", main_render_content)
 
             # Fichiers Python principaux (sauf main.py déjà traité)
-            for f in ["predictor.py", "yaml_manager.py", "card_counter.py", "scheduler.py"]:
+            for f in PACKAGE_MODULES:
                 if os.path.exists(f):
                     z.write(f)
 
@@ -441,6 +538,7 @@ async def dep_render(e):
 aiohttp==3.9.5
 PyYAML==6.0.1
 python-dotenv==1.0.1
+numpy==1.26.4
 """
             z.writestr("requirements.txt", requirements_content)
 
@@ -543,6 +641,8 @@ PORT=10000
 - `/intervalle [min]` - Intervalle rapports (1-120 min)
 - `/bilan` - Rapport immédiat et reset
 - `/reset` - Réinitialiser compteur
+- `/archive [heures]` - Totaux des bilans archivés
+- `/dashboard on|off` - Bilan instantané en un seul message modifié
 - `/deploy` - Package render_deploy.zip
 - `/dep` - Package de2000.zip (Render.com optimisé)
 
@@ -559,14 +659,13 @@ PORT=10000
 ## 🌐 Endpoints:
 - `GET /health`: Health check (retourne "Bot OK")
 - `GET /`: Root endpoint (retourne "Bot OK")
+- `GET /archive?hours=24`: Totaux des bilans archivés (JSON, ou `?start=...&end=...` en ISO)
 
 ## 🗄️ Stockage YAML:
-- `data/bot_config.yaml`: Configuration persistante
+- `data/bot_config.yaml`: Configuration persistante (canaux, intervalle rapports)
 - `data/predictions.yaml`: Historique prédictions
 - `data/auto_predictions.yaml`: Planification auto
 - `data/message_log.yaml`: Anti-doublon messages
-- `bot_config.json`: Backup configuration
-- `interval.json`: Intervalle rapports
 
 ## ⚙️ Fonctionnement:
 1. **Messages en attente (⏰)**: Mis en file d'attente
@@ -628,111 +727,362 @@ git push origin main
 # ---------- MESSAGE HANDLER ----------
 @client.on(events.NewMessage())
 async def handle_new(e):
-    if e.chat_id != detected_stat_channel: return
+    if e.chat_id != settings.get(STAT_CHANNEL): return
+    await LIVE.wait()
     txt = e.message.message or ""
 
     # Messages en attente (⏰) → Mise en file d'attente
     if "⏰" in txt or "🕐" in txt:
-        pending_messages[e.message.id] = txt
-        print(f"⏰ Message mis en attente (ID: {e.message.id}): {txt[:50]}...")
+        pending_messages.add(e.message.id, e.chat_id, txt)
+        logger.debug("⏰ Message mis en attente (ID: %s): %.50s...", e.message.id, txt)
         return
 
     # Messages finalisés (✅ ou 🔰) → Traitement immédiat
     if "✅" in txt or "🔰" in txt:
-        await process_finalized_message(txt, e.chat_id)
+        await process_finalized_message(txt, e.chat_id, e.message.id)
     else:
-        print(f"⏭️ Message non finalisé ignoré : {txt[:50]}...")
+        logger.debug("⏭️ Message non finalisé ignoré : %.50s...", txt)
 
 @client.on(events.MessageEdited())
 async def handle_edited(e):
-    if e.chat_id != detected_stat_channel: return
+    if e.chat_id != settings.get(STAT_CHANNEL): return
+    await LIVE.wait()
     txt = e.message.message or ""
 
     # Vérifier si le message était en attente
     if e.message.id in pending_messages:
-        # Le message a été édité et n'est plus en attente
-        if "⏰" not in txt and "🕐" not in txt:
-            # Message finalisé (✅ ou 🔰)
-            if "✅" in txt or "🔰" in txt:
-                print(f"✅ Message finalisé (ID: {e.message.id}): {txt[:50]}...")
-                # Retirer de la file d'attente
-                del pending_messages[e.message.id]
-                # Traiter le message finalisé
-                await process_finalized_message(txt, e.chat_id)
-            else:
-                # Message édité mais pas finalisé
-                print(f"⚠️ Message édité mais non finalisé (ID: {e.message.id}): {txt[:50]}...")
-                del pending_messages[e.message.id]
+        await resolve_pending(e.message.id, e.chat_id, txt)
+
+async def resolve_pending(message_id: int, chat_id: int, txt: str, publish: bool = True) -> bool:
+    """
+    Nouvelle version d'un message en attente: finalisé, abandonné ou toujours en attente.
+    Retourne True si un jeu a été compté (publish: voir process_finalized_message).
+    """
+    # Le message a été édité et n'est plus en attente
+    if "⏰" not in txt and "🕐" not in txt:
+        # Message finalisé (✅ ou 🔰)
+        if "✅" in txt or "🔰" in txt:
+            logger.debug("✅ Message finalisé (ID: %s): %.50s...", message_id, txt)
+            # Retirer de la file d'attente
+            pending_messages.pop(message_id)
+            # Traiter le message finalisé
+            return await process_finalized_message(txt, chat_id, message_id, publish)
         else:
-            # Toujours en attente, mettre à jour le texte
-            pending_messages[e.message.id] = txt
-            print(f"⏰ Message en attente mis à jour (ID: {e.message.id})")
-
-async def process_finalized_message(txt: str, chat_id: int):
-    """Traite un message finalisé et compte les cartes du 1er groupe"""
-    # Vérifier si le message a déjà été traité (évite double comptage)
-    if database.is_message_processed(txt, chat_id):
-        print(f"⏭️ Message déjà traité, ignoré")
-        return
+            # Message édité mais pas finalisé
+            logger.info("⚠️ Message édité mais non finalisé (ID: %s): %.50s...", message_id, txt)
+            pending_messages.pop(message_id)
+    else:
+        # Toujours en attente, mettre à jour le texte
+        pending_messages.add(message_id, chat_id, txt)
+        logger.debug("⏰ Message en attente mis à jour (ID: %s)", message_id)
+    return False
+
+async def recheck_pending():
+    """
+    Après un redémarrage, relit en un seul appel get_messages par canal les messages
+    encore en attente: ceux finalisés pendant l'arrêt sont comptés, avec un seul
+    instantané publié à la fin.
+    """
+    pending_messages.expire()
+    counted = 0
+    for chat_id, ids in pending_messages.ids_by_chat().items():
+        try:
+            messages = await client.get_messages(chat_id, ids=ids)
+        except Exception as ex:
+            logger.warning("⚠️ Vérification des messages en attente impossible (%s) : %s", chat_id, ex)
+            continue
+        for message_id, message in zip(ids, messages):
+            if message is None:
+                # Supprimé en amont: plus rien à attendre
+                pending_messages.pop(message_id)
+            elif await resolve_pending(message_id, chat_id, message.message or "", publish=False):
+                counted += 1
+    logger.info("⏰ Messages en attente vérifiés : %s, %d jeux comptés", pending_messages.stats(), counted)
+    if counted:
+        await send_instant_report()
+
+async def process_finalized_message(txt: str, chat_id: int, message_id: int, publish: bool = True,
+                                    late: bool = False) -> bool:
+    """
+    Traite un message finalisé et compte les cartes du 1er groupe.
+    publish=False (rattrapage): pas d'instantané par jeu. late=True (jeu relu après des
+    jeux plus récents): compté dans les totaux seulement (voir CardCounter.apply_late).
+    Retourne False si déjà traité.
+    """
+    record = card_counter.parse_message(txt)
+
+    # Vérifier si le message (ou le même numéro de jeu) a déjà été traité (évite double comptage)
+    if database.is_message_processed(txt, chat_id, message_id, record.number):
+        logger.debug("⏭️ Message déjà traité, ignoré")
+        return False
+
+    # Numéros sautés depuis le dernier jeu: relecture ciblée en arrière-plan
+    missing = [] if late else gaps.observe(database.game_bitmap(chat_id), record.number)
+    if missing:
+        task = asyncio.create_task(refetch_missing(chat_id, missing, database.last_message_id(chat_id), message_id))
+        BACKGROUND_TASKS.add(task)
+        task.add_done_callback(BACKGROUND_TASKS.discard)
 
     # Compter les cartes du 1er groupe
-    card_counter.add(txt)
-    print(f"🃏 Cartes du 1er groupe comptées : {txt[:50]}...")
+    card_counter.add_record(record, late=late)
+    logger.debug("🃏 Jeu compté : %.50s...", txt, extra={"sampled": True})
 
     # Marquer comme traité
-    database.mark_message_processed(txt, chat_id)
-
-    # ===== ENVOI INSTANTANÉ (sans reset) =====
+    database.mark_message_processed(txt, chat_id, message_id, record.number)
+
+    if publish:
+        await send_instant_report()
+    return True
+
+def refresh_dashboard() -> bool:
+    """Mode tableau de bord: demande une mise à jour du message (au plus toutes les DASHBOARD_INTERVAL s)."""
+    display_channel = settings.get(DISPLAY_CHANNEL)
+    if not (display_channel and settings.get(DASHBOARD)):
+        return False
+    task = dashboard.request_update(display_channel)
+    if task is not None:
+        SEND_TASKS.add(task)
+        task.add_done_callback(SEND_TASKS.discard)
+    return True
+
+async def send_instant_report():
+    """Envoie le bilan instantané (sans reset) au canal d'affichage."""
+    if refresh_dashboard():
+        return
+    display_channel = settings.get(DISPLAY_CHANNEL)
+    if not display_channel:
+        # Pas de canal d'affichage: inutile de construire le bilan
+        return
     instant = card_counter.build_report()
-    if detected_display_channel:
+    # Tâche suivie: l'arrêt attend la fin de l'envoi avant de se déconnecter
+    task = asyncio.create_task(deliver_instant_report(display_channel, instant))
+    SEND_TASKS.add(task)
+    task.add_done_callback(SEND_TASKS.discard)
+    await task
+
+async def deliver_instant_report(display_channel, instant: str):
+    """Envoi de l'instantané, avec une seconde tentative via l'entité du canal."""
+    try:
+        # Obtenir l'entité du canal avant d'envoyer
+        await client.send_message(int(display_channel), instant)
+        logger.debug("📈 Instantané envoyé au canal : %s", summarize(instant), extra={"sampled": True})
+    except Exception as ex:
+        logger.warning("❌ Erreur envoi instantané : %s", ex)
         try:
-            # Obtenir l'entité du canal avant d'envoyer
-            await client.send_message(int(detected_display_channel), instant)
-            print(f"📈 Instantané envoyé au canal : {instant}")
-        except Exception as ex:
-            print(f"❌ Erreur envoi instantané : {ex}")
-            try:
-                # Essayer de récupérer l'entité du canal d'abord
-                await client.get_entity(int(detected_display_channel))
-                await client.send_message(detected_display_channel, instant)
-                print(f"✅ Instantané envoyé (via entité) : {instant}")
-            except Exception as ex2:
-                print(f"❌ Échec total envoi : {ex2}")
+            # Essayer de récupérer l'entité du canal d'abord
+            await client.get_entity(int(display_channel))
+            await client.send_message(display_channel, instant)
+            logger.info("✅ Instantané envoyé (via entité) : %s", summarize(instant))
+        except Exception as ex2:
+            logger.error("❌ Échec total envoi : %s", ex2)
+
+# ---------- JEUX MANQUANTS ----------
+async def refetch_missing(chat_id: int, missing: list, after_id: int, before_id: int):
+    """
+    Relit les jeux manquants: d'abord en un seul get_messages sur les identifiants
+    compris entre le jeu précédent et le jeu courant, puis par recherche "#N<numéro>"
+    pour ceux encore absents.
+    Les jeux retrouvés arrivent après des jeux plus récents: ils ne sont comptés que dans
+    les totaux de l'heure en cours (pas dans les listes, séries, transitions ni fenêtres).
+    """
+    bitmap = database.game_bitmap(chat_id)
+    recovered = []
+    try:
+        if after_id is not None and before_id - after_id > 1:
+            ids = list(range(after_id + 1, before_id))[:100]
+            for message in await client.get_messages(chat_id, ids=ids):
+                txt = (message.message or "") if message is not None else ""
+                if ("✅" in txt or "🔰" in txt) and await process_finalized_message(
+                        txt, chat_id, message.id, publish=False, late=True):
+                    recovered.append(card_counter.extract_game_number(txt))
+        for number in [n for n in missing if n not in bitmap][:10]:
+            for message in await client.get_messages(chat_id, search=f"#N{number}", limit=3):
+                txt = message.message or ""
+                if (("✅" in txt or "🔰" in txt) and card_counter.extract_game_number(txt) == number
+                        and await process_finalized_message(txt, chat_id, message.id, publish=False, late=True)):
+                    recovered.append(number)
+    except Exception as ex:
+        logger.warning("⚠️ Relecture des jeux manquants impossible : %s", ex)
+    if recovered:
+        logger.warning("🕰️ Jeu(x) relu(s) en retard, comptés dans les totaux seulement (hors listes et séries) : %s",
+                       ", ".join(f"#N{n}" for n in recovered))
+    still = gaps.resolve(bitmap, missing)
+    if still:
+        logger.warning("🕳️ Jeu(x) introuvable(s) : %s", ", ".join(f"#N{n}" for n in still))
+    else:
+        logger.info("🩹 Jeu(x) manquant(s) retrouvé(s) : %s", ", ".join(f"#N{n}" for n in missing))
+
+# ---------- RATTRAPAGE ----------
+async def catch_up():
+    """
+    Relit les messages du canal source postérieurs au point de reprise (plus haut
+    message_id traité) par lots de 100, à CATCHUP_WAIT secondes d'intervalle, et les
+    fait passer par le traitement normal (finalisation + anti-doublon). Les passes de
+    CATCHUP_LIMIT messages s'enchaînent jusqu'au dernier message du canal. Un seul
+    instantané est publié à la fin; le traitement en direct attend la fin du rattrapage.
+    """
+    chat_id = settings.get(STAT_CHANNEL)
+    start = after = database.last_message_id(chat_id) if chat_id else None
+    if after is None:
+        # Premier démarrage: pas d'historique à rattraper
+        LIVE.set()
+        return
+    LIVE.clear()
+    started = time.perf_counter()
+    seen = counted = passes = 0
+    try:
+        batch = CATCHUP_LIMIT
+        while batch >= CATCHUP_LIMIT > 0:
+            # Une passe incomplète signifie que le direct est atteint
+            batch = 0
+            passes += 1
+            async for message in client.iter_messages(chat_id, min_id=after, reverse=True,
+                                                      limit=CATCHUP_LIMIT, wait_time=CATCHUP_WAIT):
+                batch += 1
+                after = max(after, message.id)
+                txt = message.message or ""
+                if "⏰" in txt or "🕐" in txt:
+                    pending_messages.add(message.id, chat_id, txt)
+                elif "✅" in txt or "🔰" in txt:
+                    if message.id in pending_messages:
+                        pending_messages.pop(message.id)
+                    if await process_finalized_message(txt, chat_id, message.id, publish=False):
+                        counted += 1
+            seen += batch
+    except Exception as ex:
+        logger.warning("⚠️ Rattrapage interrompu : %s", ex)
+    finally:
+        LIVE.set()
+    logger.info("🔁 Rattrapage depuis le message %s : %d messages relus en %d passe(s), %d jeux comptés en %.1f s",
+                start, seen, passes, counted, time.perf_counter() - started)
+    if counted:
+        await send_instant_report()
+
+async def connection_watch_loop():
+    """Relance le rattrapage après chaque reconnexion au serveur Telegram."""
+    connected = client.is_connected()
+    while True:
+        await asyncio.sleep(5)
+        now_connected = client.is_connected()
+        if now_connected and not connected:
+            logger.info("🔌 Reconnecté, rattrapage des messages manqués")
+            await catch_up()
+        connected = now_connected
 
 # ---------- WEB SERVER ----------
 async def health(request): return web.Response(text="Bot OK")
+async def archive_endpoint(request):
+    """GET /archive?hours=24 ou /archive?start=2025-11-02T14:00&end=2025-11-02T18:00 (JSON)."""
+    try:
+        if "start" in request.query:
+            start = datetime.fromisoformat(request.query["start"]).timestamp()
+            end = datetime.fromisoformat(request.query["end"]).timestamp() if "end" in request.query else time.time()
+            result = await asyncio.to_thread(archive.query, start, end)
+        else:
+            result = await asyncio.to_thread(archive.query_last_hours, int(request.query.get("hours", 24)))
+    except ValueError as ex:
+        return web.json_response({"error": str(ex)}, status=400)
+    return web.json_response(result)
 async def create_web():
     app = web.Application()
     app.router.add_get("/", health)
     app.router.add_get("/health", health)
+    app.router.add_get("/archive", archive_endpoint)
     runner = web.AppRunner(app)
     await runner.setup()
     site = web.TCPSite(runner, "0.0.0.0", PORT)
     await site.start()
-    print(f"✅ Web server on 0.0.0.0:{PORT}")
+    logger.info("✅ Web server on 0.0.0.0:%s", PORT)
     return runner
 
 # ---------- START ----------
 async def main():
-    global detected_display_channel
-    load_config()
-    load_interval()
-    await create_web()
+    # Reprise du compteur après redémarrage: dernier snapshot + rejeu du journal
+    started = time.perf_counter()
+    found, replayed = counter_journal.restore(card_counter)
+    if found:
+        logger.info("♻️ Compteur restauré (%d entrées du journal rejouées) en %.1f ms",
+                    replayed, (time.perf_counter() - started) * 1000)
+    runner = await create_web()
     await client.start(bot_token=BOT_TOKEN)
+    await send_outbox()
+    await recheck_pending()
+    await catch_up()
+    watch_task = asyncio.create_task(connection_watch_loop())
 
     # Récupérer l'entité du canal d'affichage au démarrage
-    if detected_display_channel:
+    display_channel = settings.get(DISPLAY_CHANNEL)
+    if display_channel:
         try:
-            entity = await client.get_entity(int(detected_display_channel))
-            print(f"✅ Canal d'affichage trouvé : {entity.title} (ID: {detected_display_channel})")
+            entity = await client.get_entity(int(display_channel))
+            logger.info("✅ Canal d'affichage trouvé : %s (ID: %s)", entity.title, display_channel)
         except Exception as ex:
-            print(f"⚠️ Impossible d'accéder au canal d'affichage {detected_display_channel}: {ex}")
-            print(f"💡 Assurez-vous que le bot est membre du canal et utilisez /set_display [ID] pour configurer")
+            logger.warning("⚠️ Impossible d'accéder au canal d'affichage %s: %s", display_channel, ex)
+            logger.warning("💡 Assurez-vous que le bot est membre du canal et utilisez /set_display [ID] pour configurer")
 
     restart_auto_bilan()
     me = await client.get_me()
-    print(f"Bot connecté : @{me.username}")
-    await client.run_until_disconnected()
+    logger.info("Bot connecté : @%s", me.username)
+
+    # SIGTERM (redéploiement Render) ou SIGINT: arrêt propre au lieu d'une coupure nette
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:  # Windows
+            pass
+    waiters = [asyncio.ensure_future(client.run_until_disconnected()), asyncio.ensure_future(stop.wait())]
+    try:
+        await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for waiter in waiters:
+            waiter.cancel()
+        watch_task.cancel()
+        await shutdown(runner)
+
+async def shutdown(runner: web.AppRunner):
+    """
+    Arrêt propre en SHUTDOWN_TIMEOUT secondes au plus: plus de nouveaux événements,
+    envois de bilans terminés (ou conservés pour le prochain démarrage), instantanés et
+    tableau de bord envoyés avant la déconnexion, état du
+    compteur, anti-doublon et écritures en file sur disque, serveur web fermé.
+    """
+    deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+    remaining = lambda: max(0.0, deadline - time.monotonic())
+    logger.info("🛑 Arrêt en cours (budget %.0f s)", SHUTDOWN_TIMEOUT)
+
+    for callback, event in client.list_event_handlers():
+        client.remove_event_handler(callback, event)
+    if AUTO_TASK:
+        AUTO_TASK.cancel()
+
+    # Bilans, instantanés et tableau de bord en cours d'envoi (le client est encore connecté)
+    tasks = BACKGROUND_TASKS | SEND_TASKS
+    if dashboard.pending is not None:
+        tasks.add(dashboard.pending)
+    if tasks:
+        _, unfinished = await asyncio.wait(tasks, timeout=remaining() / 2)
+        for task in unfinished:
+            task.cancel()
+        await asyncio.gather(*unfinished, return_exceptions=True)
+
+    counter_journal.snapshot(card_counter)
+    try:
+        # Hors de la boucle d'événements et borné par le budget restant
+        await asyncio.to_thread(database.flush, remaining())
+    except Exception as ex:
+        logger.error("❌ Erreur sauvegarde anti-doublon : %s", ex)
+    if not await asyncio.to_thread(writer.flush, remaining()):
+        logger.warning("⚠️ Écritures de persistance non terminées à l'arrêt")
+
+    try:
+        await asyncio.wait_for(runner.cleanup(), timeout=remaining() or 0.1)
+    except Exception as ex:
+        logger.warning("⚠️ Serveur web non fermé proprement : %r", ex)
+    if client.is_connected():
+        await client.disconnect()
+    logger.info("✅ Arrêt terminé")
 
 if __name__ == "__main__":
     import asyncio
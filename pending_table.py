@@ -0,0 +1,108 @@
+"""
+Table des messages ⏰ en attente de finalisation (édition en ✅/🔰).
+
+Bornée en taille (les plus anciens sont évincés) et en durée (TTL): un message jamais
+édité (supprimé en amont, édition manquée) finit par expirer au lieu de rester en
+mémoire. La table est persistée (data/pending_messages.json, via le thread de
+persistance) pour survivre aux redémarrages.
+
+Variables d'environnement:
+- PENDING_TTL : durée de vie d'une entrée en secondes (900 par défaut)
+- PENDING_MAX : nombre maximal d'entrées (500 par défaut)
+"""
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from persistence import writer
+
+logger = logging.getLogger(__name__)
+
+PENDING_TTL = float(os.getenv("PENDING_TTL", "900"))
+PENDING_MAX = int(os.getenv("PENDING_MAX", "500"))
+
+
+class PendingTable:
+    def __init__(self, file_path: str = "data/pending_messages.json", ttl: float = PENDING_TTL,
+                 max_size: int = PENDING_MAX):
+        self.file_path = file_path
+        self.ttl = ttl
+        self.max_size = max_size
+        # message_id -> (chat_id, texte, ajouté à), dans l'ordre d'arrivée (le plus ancien en tête)
+        self._entries: "OrderedDict[int, Tuple[int, str, float]]" = OrderedDict()
+        self.expired = 0   # Entrées retirées par le TTL
+        self.evicted = 0   # Entrées retirées par la limite de taille
+        self.resolved = 0  # Entrées finalisées ou abandonnées (édition, vérification au démarrage)
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, message_id: int) -> bool:
+        return message_id in self._entries
+
+    def _load(self):
+        try:
+            data = json.loads(writer.read_text(self.file_path) or "[]")
+        except Exception as e:
+            logger.error("❌ Erreur chargement %s : %s", self.file_path, e)
+            return
+        for message_id, chat_id, text, added_at in data:
+            self._entries[int(message_id)] = (chat_id, text, added_at)
+        self.expire()
+
+    def _save(self):
+        writer.write_text(self.file_path, json.dumps(
+            [[message_id, chat_id, text, added_at] for message_id, (chat_id, text, added_at) in self._entries.items()],
+            ensure_ascii=False))
+
+    def add(self, message_id: int, chat_id: int, text: str):
+        """Ajoute un message en attente ou met à jour son texte (la date d'ajout est conservée)."""
+        entry = self._entries.get(message_id)
+        added_at = entry[2] if entry is not None else time.time()
+        self._entries[message_id] = (chat_id, text, added_at)
+        self.expire()
+        while len(self._entries) > self.max_size:
+            old_id, _ = self._entries.popitem(last=False)
+            self.evicted += 1
+            logger.warning("🗑️ File d'attente pleine, message %s évincé", old_id)
+        self._save()
+
+    def pop(self, message_id: int) -> Optional[str]:
+        """Retire un message (finalisé ou abandonné) et retourne son dernier texte."""
+        entry = self._entries.pop(message_id, None)
+        if entry is None:
+            return None
+        self.resolved += 1
+        self._save()
+        return entry[1]
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Retire les entrées plus vieilles que le TTL; retourne leur nombre."""
+        limit = (now or time.time()) - self.ttl
+        count = 0
+        while self._entries:
+            message_id, (_, _, added_at) = next(iter(self._entries.items()))
+            if added_at >= limit:
+                break
+            del self._entries[message_id]
+            count += 1
+        if count:
+            self.expired += count
+            logger.info("⌛ %d message(s) en attente expiré(s) sans finalisation", count)
+            self._save()
+        return count
+
+    def ids_by_chat(self) -> Dict[int, List[int]]:
+        """Identifiants en attente regroupés par canal (pour une vérification groupée)."""
+        result: Dict[int, List[int]] = {}
+        for message_id, (chat_id, _, _) in self._entries.items():
+            result.setdefault(chat_id, []).append(message_id)
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        return {"pending": len(self._entries), "expired": self.expired, "evicted": self.evicted,
+                "resolved": self.resolved}
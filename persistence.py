@@ -0,0 +1,137 @@
+"""
+Écrivain de persistance en arrière-plan: un seul thread prend les demandes d'écriture
+dans une file, fusionne les écritures répétées d'un même fichier et écrit de façon
+atomique (fichier temporaire + rename). Un contenu peut être une fonction sans argument
+qui produit les octets: elle est appelée sur ce thread (ex: sérialisation d'un snapshot). Les gestionnaires async rendent la main dès
+que l'écriture est en file; flush() attend que tout soit sur disque (arrêt du bot).
+"""
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+PathLike = Union[str, Path]
+Content = Union[bytes, Callable[[], bytes]]
+
+
+class BackgroundWriter:
+    def __init__(self):
+        # Fichier -> ("replace", [contenu]) ou ("append", [morceaux]) en octets, dans l'ordre d'arrivée
+        self._pending: Dict[Path, Tuple[str, List[Content]]] = {}
+        self._cond = threading.Condition()
+        self._busy = False
+        self._writing: Optional[Path] = None  # Fichier en cours d'écriture (retiré de la file)
+        self._thread: Optional[threading.Thread] = None
+        self.writes = 0      # Écritures disque effectuées
+        self.coalesced = 0   # Demandes fusionnées avec une écriture en attente
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="persistence-writer", daemon=True)
+            self._thread.start()
+
+    def write_text(self, path: PathLike, content: str):
+        """Remplace le contenu du fichier (seule la dernière version en attente est écrite)."""
+        self.write_bytes(path, content.encode("utf-8"))
+
+    def append_text(self, path: PathLike, content: str):
+        """Ajoute du texte en fin de fichier (les ajouts en attente sont regroupés)."""
+        self.append_bytes(path, content.encode("utf-8"))
+
+    def read_text(self, path: PathLike) -> Optional[str]:
+        """Contenu du fichier en tenant compte des écritures encore en file (None s'il n'existe pas)."""
+        data = self.read_bytes(path)
+        return data.decode("utf-8") if data is not None else None
+
+    def write_bytes(self, path: PathLike, content: Content):
+        """
+        Remplace le contenu du fichier. Le remplacement passe après toutes les écritures
+        déjà en file (y compris celles d'autres fichiers), ce qui préserve l'ordre entre fichiers.
+        `content` peut être une fonction qui produit les octets, appelée sur le thread d'écriture.
+        """
+        path = Path(path)
+        with self._cond:
+            if self._pending.pop(path, None) is not None:
+                self.coalesced += 1
+            self._pending[path] = ("replace", [content])
+            self._ensure_thread()
+            self._cond.notify()
+
+    def append_bytes(self, path: PathLike, content: bytes):
+        """Ajoute des octets en fin de fichier (les ajouts en attente sont regroupés)."""
+        path = Path(path)
+        with self._cond:
+            pending = self._pending.get(path)
+            if pending is not None:
+                self.coalesced += 1
+                pending[1].append(content)
+            else:
+                self._pending[path] = ("append", [content])
+            self._ensure_thread()
+            self._cond.notify()
+
+    def read_bytes(self, path: PathLike) -> Optional[bytes]:
+        """Octets du fichier en tenant compte des écritures encore en file (None s'il n'existe pas)."""
+        path = Path(path)
+        with self._cond:
+            # Une écriture retirée de la file mais pas encore sur disque n'est visible nulle part;
+            # le fichier est lu sous le verrou pour que la file ne change pas entre-temps
+            self._cond.wait_for(lambda: self._writing != path)
+            pending = self._pending.get(path)
+            if pending is not None and pending[0] == "replace":
+                return self._join(pending[1])
+            extra = self._join(pending[1]) if pending is not None else b""
+            try:
+                return path.read_bytes() + extra
+            except FileNotFoundError:
+                return extra or None
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Attend que toutes les écritures en file soient sur disque. Retourne False si le délai expire."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending)
+                path = next(iter(self._pending))
+                mode, parts = self._pending.pop(path)
+                self._busy = True
+                self._writing = path
+            try:
+                self._write(path, mode, self._join(parts))
+                self.writes += 1
+            except Exception as e:
+                logger.error("❌ Erreur écriture %s : %s", path, e)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._writing = None
+                    self._cond.notify_all()
+
+    @staticmethod
+    def _join(parts: List[Content]) -> bytes:
+        return b"".join(part() if callable(part) else part for part in parts)
+
+    @staticmethod
+    def _write(path: Path, mode: str, content: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if mode == "append":
+            with open(path, "ab") as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            return
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+
+writer = BackgroundWriter()
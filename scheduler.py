@@ -5,6 +5,7 @@ import os
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
 from telethon import TelegramClient
+from persistence import writer
 
 class PredictionScheduler:
     """Système de planification automatique des prédictions"""
@@ -101,10 +102,9 @@ class PredictionScheduler:
         return planification
     
     def save_schedule(self, schedule_data: Dict[str, Any]):
-        """Sauvegarde la planification dans le fichier YAML"""
+        """Sauvegarde la planification dans le fichier YAML (écriture atomique en arrière-plan)"""
         try:
-            with open(self.schedule_file, "w", encoding='utf-8') as f:
-                yaml.dump(schedule_data, f, allow_unicode=True, default_flow_style=False)
+            writer.write_text(self.schedule_file, yaml.dump(schedule_data, allow_unicode=True, default_flow_style=False))
             print(f"✅ Planification sauvegardée dans {self.schedule_file}")
         except Exception as e:
             print(f"❌ Erreur sauvegarde planification: {e}")
@@ -112,9 +112,9 @@ class PredictionScheduler:
     def load_schedule(self) -> Dict[str, Any]:
         """Charge la planification depuis le fichier YAML"""
         try:
-            if os.path.exists(self.schedule_file):
-                with open(self.schedule_file, "r", encoding='utf-8') as f:
-                    data = yaml.safe_load(f) or {}
+            text = writer.read_text(self.schedule_file)
+            if text is not None:
+                data = yaml.safe_load(text) or {}
                 print(f"✅ Planification chargée: {len(data)} entrées")
                 return data
             else:
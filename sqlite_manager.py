@@ -0,0 +1,143 @@
+import sqlite3, logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional
+from game_bitmap import GameBitmap
+from config_store import get_store
+from yaml_manager import YAMLDataManager, MESSAGE_LOG_LIMIT
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS message_log (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    chat_id      INTEGER NOT NULL,
+    message_key  TEXT NOT NULL,
+    game_number  INTEGER,
+    fingerprint  TEXT NOT NULL,
+    processed_at TEXT NOT NULL,
+    UNIQUE (chat_id, message_key)
+);
+CREATE INDEX IF NOT EXISTS idx_message_log_game ON message_log (chat_id, game_number);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+PRUNE_EVERY = 100  # Nettoyage du journal anti-doublon toutes les N insertions
+
+
+class SQLiteDataManager:
+    """
+    Stockage SQLite (mode WAL) avec la même interface que YAMLDataManager:
+    écritures d'une seule ligne et lectures indexées, quel que soit le volume.
+    Le journal anti-doublon existant (processed_messages.log) est repris une seule fois au premier démarrage.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.data_dir = Path("data")
+        self.data_dir.mkdir(exist_ok=True)
+        self.db_path = Path(db_path) if db_path else self.data_dir / "bot.db"
+        self.conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.game_bitmaps: Dict[int, GameBitmap] = {}
+        self.checkpoints: Dict[int, int] = {}  # Plus haut message_id traité par canal
+        self.changed_after_count = 0  # Messages modifiés après avoir été comptés
+        self._inserts = 0
+        self._migrate_from_yaml()
+        self._load_game_bitmaps()
+
+    # ---------- MIGRATION ----------
+    def _migrate_from_yaml(self):
+        if self.conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_from_yaml'").fetchone():
+            return
+        now = datetime.now().isoformat()
+        with self.conn:
+            self.conn.execute("BEGIN")
+            journal = self.data_dir / "processed_messages.log"
+            if journal.exists():
+                for line in journal.read_text(encoding="utf-8").splitlines():
+                    parts = line.split("\t")
+                    if len(parts) != 4:
+                        continue
+                    chat_id, message_id, game_number, fp = parts
+                    self.conn.execute(
+                        "INSERT OR IGNORE INTO message_log (chat_id, message_key, game_number, fingerprint, processed_at)"
+                        " VALUES (?, ?, ?, ?, ?)",
+                        (int(chat_id), message_id if message_id != "-" else fp,
+                         int(game_number) if game_number != "-" else None, fp, now))
+            self.conn.execute("INSERT INTO meta (key, value) VALUES ('migrated_from_yaml', ?)", (now,))
+        logger.info("📦 Migration YAML → SQLite terminée (%s)", self.db_path)
+
+    # ---------- CONFIG ----------
+    # La configuration reste dans data/bot_config.yaml (config_store), quel que soit le stockage
+    def set_config(self, key: str, value: Any):
+        get_store().set(key, value)
+
+    def get_config(self, key: str, default=None):
+        return get_store().get(key, default)
+
+    # ---------- ANTI-DOUBLON ----------
+    def _load_game_bitmaps(self):
+        rows = self.conn.execute(
+            "SELECT chat_id, game_number FROM message_log WHERE game_number IS NOT NULL ORDER BY id DESC LIMIT ?",
+            (MESSAGE_LOG_LIMIT,)).fetchall()
+        for chat_id, game_number in reversed(rows):
+            self.game_bitmap(chat_id).add(game_number)
+        # Sans message_id, la clé est l'empreinte: ces lignes ne comptent pas pour le point de reprise
+        self.checkpoints = dict(self.conn.execute(
+            "SELECT chat_id, MAX(CAST(message_key AS INTEGER)) FROM message_log"
+            " WHERE message_key != fingerprint GROUP BY chat_id").fetchall())
+
+    def last_message_id(self, channel_id: int) -> Optional[int]:
+        """Plus haut message_id traité pour un canal (point de reprise), None si aucun."""
+        return self.checkpoints.get(channel_id)
+
+    def game_bitmap(self, channel_id: int) -> GameBitmap:
+        bitmap = self.game_bitmaps.get(channel_id)
+        if bitmap is None:
+            bitmap = self.game_bitmaps[channel_id] = GameBitmap()
+        return bitmap
+
+    def mark_message_processed(self, content: str, channel_id: int, message_id: Optional[int] = None,
+                               game_number: Optional[int] = None):
+        fp = YAMLDataManager._fingerprint(content)
+        key = str(message_id) if message_id is not None else fp
+        self.conn.execute(
+            "INSERT OR IGNORE INTO message_log (chat_id, message_key, game_number, fingerprint, processed_at)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (channel_id, key, game_number, fp, datetime.now().isoformat()))
+        if game_number is not None:
+            self.game_bitmap(channel_id).add(game_number)
+        if message_id is not None and message_id > self.checkpoints.get(channel_id, 0):
+            self.checkpoints[channel_id] = message_id
+        self._inserts += 1
+        if self._inserts % PRUNE_EVERY == 0:
+            self.conn.execute("DELETE FROM message_log WHERE id <= (SELECT MAX(id) FROM message_log) - ?",
+                              (MESSAGE_LOG_LIMIT,))
+
+    def is_message_processed(self, content: str, channel_id: int, message_id: Optional[int] = None,
+                             game_number: Optional[int] = None) -> bool:
+        fp = YAMLDataManager._fingerprint(content)
+        key = str(message_id) if message_id is not None else fp
+        row = self.conn.execute(
+            "SELECT fingerprint FROM message_log WHERE chat_id = ? AND message_key = ?", (channel_id, key)).fetchone()
+        if row is not None:
+            if row[0] != fp:
+                # Message corrigé après comptage: on ne le compte pas une seconde fois
+                self.changed_after_count += 1
+                logger.info("✏️ Message %s du canal %s modifié après comptage, ignoré", message_id, channel_id)
+            return True
+        bitmap = self.game_bitmaps.get(channel_id)
+        return game_number is not None and bitmap is not None and game_number in bitmap
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Reporte le journal WAL dans la base (point de contrôle). Le mode PASSIVE
+        n'attend aucun verrou: il reste dans le budget `timeout` (même interface que YAMLDataManager).
+        """
+        self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+        return True
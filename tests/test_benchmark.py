@@ -0,0 +1,6 @@
+from benchmark import MAX_BYTES_PER_GAME, bench_memory, generate_messages
+
+
+def test_footprint_per_game_stays_under_limit():
+    memory = bench_memory(generate_messages(20000))
+    assert memory["marginal_bytes_per_game"] <= MAX_BYTES_PER_GAME
@@ -0,0 +1,35 @@
+from bilan_archive import _RECORD, BilanArchive
+from card_counter import CardCounter, parse_game
+from persistence import writer
+
+
+def counter_with(numbers):
+    counter = CardCounter()
+    for number in numbers:
+        counter.add_record(parse_game(f"#N{number}. ✅8(K♠️5♥️3♦️) - 6(A♣️5♠️) #T14"))
+    return counter
+
+
+def test_last_end_reads_only_the_last_complete_record(tmp_path):
+    path = tmp_path / "archive.bin"
+    assert BilanArchive(str(path)).last_end() is None
+    archive = BilanArchive(str(path))
+    archive.append(counter_with([1]), 0, 3600)
+    archive.append(counter_with([2]), 3600, 7200)
+    writer.flush(5)
+    with open(path, "ab") as f:
+        f.write(b"\0" * (_RECORD.size // 2))  # Enregistrement tronqué par un arrêt
+    assert BilanArchive(str(path)).last_end() == 7200
+
+
+
+def test_query_bounds_select_hours_by_end_date(tmp_path):
+    archive = BilanArchive(str(tmp_path / "archive.bin"))
+    for hour in range(4):
+        archive.append(counter_with(range(hour + 1)), hour * 3600, (hour + 1) * 3600)
+    writer.flush(5)
+    # Fin dans ]start, end]: heures se terminant à 7200 et 10800
+    result = archive.query(3600, 10800)
+    assert (result["hours"], result["start"], result["end"]) == (2, 3600, 10800)
+    assert result["games"] == 2 + 3
+    assert archive.query(14400, 20000)["hours"] == 0
@@ -0,0 +1,169 @@
+import pickle
+
+import pytest
+
+from card_counter import WINDOW_SIZES, CardCounter, GameListRenderer, parse_game
+
+
+def game(number: int) -> str:
+    if number % 2:
+        return f"#N{number}. ✅8(K♠️5♥️3♦️) - 6(A♣️5♠️) #T14"
+    return f"#N{number}. 2(10♠️2♥️) - ✅9(9♣️Q♠️) #T11"
+
+
+def fill(counter: CardCounter, numbers) -> None:
+    for number in numbers:
+        counter.add_record(parse_game(game(number)))
+
+
+@pytest.mark.parametrize("count", [0, 1, 9, 10, 11, 25])
+def test_renderer_text_matches_plain_formatting(count):
+    renderer = GameListRenderer()
+    numbers = list(range(1000, 1000 + count))
+    for number in numbers:
+        renderer.append(number)
+    expected = "\n".join(" ".join(f"**#N{n}**" for n in numbers[i:i + 10]) for i in range(0, count, 10))
+    assert len(renderer) == count
+    assert renderer.text() == expected
+    renderer.append(5000)
+    assert renderer.text().endswith("**#N5000**")
+
+
+def test_renderer_keeps_compressed_text():
+    renderer = GameListRenderer()
+    for number in range(1, 10001):
+        renderer.append(number)
+    # Texte brut: ~12 octets par numéro
+    assert renderer.nbytes() < 5 * 10000
+    assert renderer.text().count("**#N") == 10000
+
+
+def test_spilled_counter_stays_within_budget_without_reading_disk(tmp_path, monkeypatch):
+    counter = CardCounter()
+    budget = 16 * 1024
+    counter.set_memory_budget(budget, spill_dir=str(tmp_path))
+    peak = 0
+    for start in range(1, 20001, 500):
+        fill(counter, range(start, start + 500))
+        peak = max(peak, counter.memory_usage())
+        counter.build_report()
+    assert counter._store.spilled_rows
+    # Marge: au plus SPILL_CHECK_EVERY jeux et un rapport ajoutés entre deux contrôles
+    assert peak < 3 * budget
+
+    def no_disk(*args, **kwargs):
+        raise AssertionError("le rapport instantané ne doit pas relire le disque")
+
+    fill(counter, [20001])
+    monkeypatch.setattr(type(counter._store), "full_rows", no_disk)
+    monkeypatch.setattr("builtins.open", no_disk)
+    report = counter.build_report()
+    assert "📦" in report and "**#N20001**" in report
+
+
+def test_restored_spilled_counter_keeps_lists_on_disk(tmp_path):
+    counter, resident = CardCounter(), CardCounter()
+    counter.set_memory_budget(1, spill_dir=str(tmp_path))
+    fill(counter, range(1, 2001))
+    fill(resident, range(1, 2001))
+    # Comme au redémarrage: le nouveau compteur reprend le stockage et ses segments
+    restored = CardCounter()
+    restored.set_memory_budget(1, spill_dir=str(tmp_path))
+    restored.restore_state(pickle.loads(pickle.dumps(counter.snapshot_state())))
+    assert all(renderer.spilled for renderer in restored._renderers.values() if len(renderer))
+    assert restored.render_full_report() == resident.render_full_report()
+    restored.release()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_spilled_report_matches_resident_report(tmp_path):
+    spilled, resident = CardCounter(), CardCounter()
+    spilled.set_memory_budget(1, spill_dir=str(tmp_path))
+    fill(spilled, range(1, 2001))
+    fill(resident, range(1, 2001))
+    assert spilled._store.spilled_rows
+    assert spilled.render_full_report() == resident.render_full_report()
+
+
+def test_merge_of_interleaved_streams_matches_single_counter():
+    single, left, right = CardCounter(), CardCounter(), CardCounter()
+    fill(left, [n for n in range(1, 41) if n % 3])
+    fill(right, [n for n in range(1, 41) if not n % 3])
+    fill(single, range(1, 41))
+    left.merge(right)
+    assert left.get_transitions(cumulative=True) == single.get_transitions(cumulative=True)
+    assert left.get_transitions() == single.get_transitions()
+    fill(left, [41])
+    fill(single, [41])
+    assert left.get_transitions(cumulative=True) == single.get_transitions(cumulative=True)
+
+
+def test_late_game_only_updates_order_independent_counts():
+    counter, reference = CardCounter(), CardCounter()
+    fill(counter, [104, 106])
+    fill(reference, [104, 106])
+    counter.add_record(parse_game(game(105)), late=True)
+    assert counter.get_game_count() == 3
+    assert counter.get_counts()["winner"]["joueur"] == reference.get_counts()["winner"]["joueur"] + 1
+    assert counter.get_transitions() == reference.get_transitions()
+    assert counter.get_streaks() == reference.get_streaks()
+    assert "**#N105**" not in counter.build_report()
+    merged = CardCounter().merge(counter)
+    assert merged.get_game_count() == 3
+    assert merged.get_counts() == counter.get_counts()
+
+
+def test_merge_after_detach_counts_a_single_junction():
+    single, left, right = CardCounter(), CardCounter(), CardCounter()
+    for counter in (single, left):
+        fill(counter, range(1, 21))
+        counter.detach()
+    fill(single, range(21, 41))
+    fill(left, [n for n in range(21, 41) if n % 3])
+    fill(right, [n for n in range(21, 41) if not n % 3])
+    left.merge(right)
+    assert left.get_transitions(cumulative=True) == single.get_transitions(cumulative=True)
+    fill(left, [41])
+    fill(single, [41])
+    assert left.get_transitions(cumulative=True) == single.get_transitions(cumulative=True)
+
+
+def test_merge_of_two_detached_counters_keeps_both_histories():
+    single, left, right, history = CardCounter(), CardCounter(), CardCounter(), CardCounter()
+    for counter in (single, left):
+        fill(counter, range(1, 21))
+        counter.detach()
+    fill(right, range(101, 111))
+    fill(history, range(101, 111))
+    right.detach()
+    fill(single, range(21, 41))
+    fill(left, [n for n in range(21, 41) if n % 2])
+    fill(right, [n for n in range(21, 41) if not n % 2])
+    left.merge(right)
+    expected = {
+        name: [[a + b for a, b in zip(row, other)] for row, other in zip(matrix, history.get_transitions()[name])]
+        for name, matrix in single.get_transitions(cumulative=True).items()
+    }
+    assert left.get_transitions(cumulative=True) == expected
+    assert left.get_transitions() == single.get_transitions()
+
+
+def test_detached_counter_keeps_recent_trend():
+    counter = CardCounter()
+    fill(counter, range(1, 31))
+    frozen = counter.detach()
+    assert "TENDANCE RÉCENTE" in frozen.render_full_report()
+    fill(counter, [31])
+    assert frozen.get_window_summaries() != counter.get_window_summaries()
+    assert len(counter._windows[WINDOW_SIZES[0]]) == min(31, WINDOW_SIZES[0])
+
+
+def test_inconsistent_games_are_rejected_and_not_counted():
+    counter = CardCounter()
+    fill(counter, [1])
+    counter.add("#N2. ✅7(K♠️5♥️3♦️) - 6(A♣️5♠️) #T14")
+    counter.add("#N3. ✅8(K♠️) - 6(A♣️5♠️) #T14")
+    assert counter.add_batch([game(4), "#N5. ✅7(K♠️5♥️3♦️) - 6(A♣️5♠️) #T14"]) == 1
+    assert counter.get_game_count() == 2
+    assert counter.get_rejected_counts() == {"cartes": 1, "points": 2}
+    assert "🚫 Messages rejetés : 3" in counter.build_report()
@@ -0,0 +1,32 @@
+import json
+
+import yaml
+
+from config_store import AUTO_BILAN_MIN, DEFAULTS, DISPLAY_CHANNEL, STAT_CHANNEL, ConfigStore
+from persistence import writer
+
+
+def test_manual_edit_is_picked_up_after_the_check_interval(tmp_path):
+    path = tmp_path / "bot_config.yaml"
+    store = ConfigStore(str(path))
+    assert store.get(AUTO_BILAN_MIN) == DEFAULTS[AUTO_BILAN_MIN]
+    store.set(AUTO_BILAN_MIN, 15)
+    assert writer.flush(5)
+    assert store.get(AUTO_BILAN_MIN) == 15
+
+    path.write_text(yaml.dump({AUTO_BILAN_MIN: {"value": 45, "updated_at": "manuel"}}), encoding="utf-8")
+    # Pas de nouveau contrôle du fichier avant RELOAD_CHECK_SECONDS
+    assert store.get(AUTO_BILAN_MIN) == 15
+    store._next_check = 0.0
+    assert store.get(AUTO_BILAN_MIN) == 45
+
+
+def test_legacy_json_files_are_migrated_once(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "bot_config.json").write_text(json.dumps({"stat_channel": -1, "display_channel": -2}))
+    (tmp_path / "interval.json").write_text("20")
+    store = ConfigStore(str(tmp_path / "data" / "bot_config.yaml"))
+    assert (store.get(STAT_CHANNEL), store.get(DISPLAY_CHANNEL), store.get(AUTO_BILAN_MIN)) == (-1, -2, 20)
+    assert (tmp_path / "bot_config.json.migrated").exists() and (tmp_path / "interval.json.migrated").exists()
+    assert writer.flush(5)
+    assert ConfigStore(str(tmp_path / "data" / "bot_config.yaml")).get(STAT_CHANNEL) == -1
@@ -0,0 +1,66 @@
+import pickle
+import threading
+
+import counter_journal
+from card_counter import CardCounter, parse_game
+from counter_journal import CounterJournal
+from persistence import writer
+
+
+def game(number: int) -> str:
+    return f"#N{number}. ✅8(K♠️5♥️3♦️) - 6(A♣️5♠️) #T14"
+
+
+def test_snapshot_is_pickled_on_the_writer_thread(tmp_path, monkeypatch):
+    threads, original = [], pickle.dumps
+
+    def dumps(obj, protocol=None):
+        threads.append(threading.current_thread().name)
+        return original(obj, protocol=protocol)
+
+    monkeypatch.setattr(counter_journal.pickle, "dumps", dumps)
+    counter, journal = CardCounter(), CounterJournal(str(tmp_path))
+    counter.add(game(1))
+    journal.snapshot(counter)
+    # L'état est copié au moment du snapshot: un jeu ajouté ensuite n'y est pas
+    counter.add_record(parse_game(game(2)))
+    assert writer.flush(5)
+    assert threads and set(threads) == {"persistence-writer"}
+    saved = pickle.loads((tmp_path / "counter_snapshot.bin").read_bytes())
+    assert len(saved["state"]["store"]) == 1
+
+
+def test_restart_replays_the_journal_after_the_snapshot(tmp_path):
+    counter, journal = CardCounter(), CounterJournal(str(tmp_path))
+    journal.restore(counter)
+    for number in range(1, 6):
+        counter.add(game(number))
+    counter.add("#N6. ✅7(K♠️5♥️3♦️) - 6(A♣️5♠️) #T14")  # Rejeté (points)
+    assert writer.flush(5)
+
+    restored = CardCounter()
+    found, replayed = CounterJournal(str(tmp_path)).restore(restored)
+    assert (found, replayed) == (True, 6)
+    assert restored.get_game_count() == 5
+    assert restored.get_rejected_counts() == counter.get_rejected_counts()
+    assert restored.build_report() == counter.build_report()
+    assert writer.flush(5)
+
+
+def test_journal_of_a_previous_epoch_is_not_replayed(tmp_path):
+    counter, journal = CardCounter(), CounterJournal(str(tmp_path))
+    journal.restore(counter)
+    for number in range(1, 4):
+        counter.add(game(number))
+    assert writer.flush(5)
+    stale = (tmp_path / "counter_journal.bin").read_bytes()
+    journal.snapshot(counter)
+    assert writer.flush(5)
+    # Arrêt entre l'écriture du snapshot et la remise à zéro du journal
+    (tmp_path / "counter_journal.bin").write_bytes(stale + b"\x00" * 5)
+
+    restored = CardCounter()
+    found, replayed = CounterJournal(str(tmp_path)).restore(restored)
+    assert (found, replayed) == (True, 0)
+    assert restored.get_game_count() == 3
+    assert writer.flush(5)
@@ -0,0 +1,91 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from telethon.errors import FloodWaitError, MessageIdInvalidError
+
+import config_store
+import dashboard
+from dashboard import MESSAGES_KEY, Dashboard
+from persistence import writer
+
+
+class FakeClient:
+    def __init__(self, edit_errors=()):
+        self.edit_errors = list(edit_errors)
+        self.edits = []
+        self.sent = []
+
+    async def edit_message(self, chat_id, message_id, text):
+        if self.edit_errors:
+            raise self.edit_errors.pop(0)
+        self.edits.append((chat_id, message_id, text))
+
+    async def send_message(self, chat_id, text):
+        self.sent.append((chat_id, text))
+        return SimpleNamespace(id=100 + len(self.sent))
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config_store, "_store", None)
+    store = config_store.get_store()
+    store.set(MESSAGES_KEY, {"-1": 7})
+    yield store
+    # Les chemins sont relatifs: écrire avant de quitter tmp_path
+    writer.flush(5)
+
+
+def test_deleted_message_is_recreated(store):
+    client = FakeClient([MessageIdInvalidError(request=None)])
+    asyncio.run(Dashboard(client, lambda: "x", 0)._publish(-1, "bilan"))
+    assert client.sent == [(-1, "bilan")]
+    assert store.get(MESSAGES_KEY) == {"-1": 101}
+
+
+def test_flood_wait_retries_the_edit(store, monkeypatch):
+    waits = []
+
+    async def sleep(seconds):
+        waits.append(seconds)
+
+    monkeypatch.setattr(dashboard.asyncio, "sleep", sleep)
+    client = FakeClient([FloodWaitError(request=None, capture=3)])
+    asyncio.run(Dashboard(client, lambda: "x", 0)._publish(-1, "bilan"))
+    assert waits == [3]
+    assert client.edits == [(-1, 7, "bilan")]
+    assert client.sent == []
+
+
+def test_other_errors_do_not_create_a_message(store):
+    client = FakeClient([ConnectionError("hors ligne")])
+    board = Dashboard(client, lambda: "bilan", 0)
+    asyncio.run(board._update_later(-1, 0))
+    assert client.sent == []
+    assert board.edits == 0
+
+
+def test_request_during_publish_schedules_one_more_update(store):
+    state = {"text": "v1"}
+
+    class SlowClient(FakeClient):
+        async def edit_message(self, chat_id, message_id, text):
+            await release.wait()
+            await super().edit_message(chat_id, message_id, text)
+
+    async def scenario():
+        client = SlowClient()
+        board = Dashboard(client, lambda: state["text"], 0)
+        first = board.request_update(-1)
+        await asyncio.sleep(0)  # Rendu de "v1" fait, édition en cours
+        state["text"] = "v2"
+        assert board.request_update(-1) is None
+        assert board.request_update(-1) is None
+        release.set()
+        await first
+        await board._pending
+        return client.edits
+
+    release = asyncio.Event()
+    assert asyncio.run(scenario()) == [(-1, 7, "v1"), (-1, 7, "v2")]
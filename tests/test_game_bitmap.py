@@ -0,0 +1,50 @@
+from game_bitmap import GameBitmap
+from persistence import writer
+
+
+def test_restart_of_numbering_is_not_a_duplicate():
+    bitmap = GameBitmap()
+    for number in range(1, 1441):
+        bitmap.add(number)
+    assert 1440 in bitmap
+    # Nouvelle journée: la numérotation repart à #N1
+    assert 1 not in bitmap
+    bitmap.add(1)
+    assert 1 in bitmap
+    assert 2 not in bitmap
+    bitmap.add(2)
+    assert 2 in bitmap
+    assert 1439 not in bitmap
+
+
+def test_recent_number_is_a_duplicate():
+    bitmap = GameBitmap()
+    for number in range(1, 1441):
+        bitmap.add(number)
+    assert 1000 in bitmap
+    assert 1441 not in bitmap
+
+
+def test_data_manager_counts_games_after_restart(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from yaml_manager import YAMLDataManager
+
+    manager = YAMLDataManager()
+    for number in range(1, 1441):
+        manager.mark_message_processed(f"#N{number}", -100, 1000 + number, number)
+    assert not manager.is_message_processed("#N1 nouveau", -100, 5000, 1)
+    manager.mark_message_processed("#N1 nouveau", -100, 5000, 1)
+    assert not manager.is_message_processed("#N2 nouveau", -100, 5001, 2)
+    writer.flush(5)
+
+
+def test_tracked_range_ends_at_the_reset_gap():
+    bitmap = GameBitmap()
+    assert len(bitmap.bits) * 8 == GameBitmap.SIZE
+    high = 70000
+    for number in range(high - 600, high + 1):
+        bitmap.add(number)
+    assert high - GameBitmap.CYCLE_RESET_GAP in bitmap
+    assert high - GameBitmap.CYCLE_RESET_GAP - 1 not in bitmap
+    assert high - 65536 not in bitmap
+    assert high - GameBitmap.SIZE not in bitmap
@@ -0,0 +1,30 @@
+from pending_table import PendingTable
+from persistence import writer
+
+
+def test_entries_expire_after_the_ttl(tmp_path, monkeypatch):
+    clock = {"now": 1000.0}
+    monkeypatch.setattr("pending_table.time.time", lambda: clock["now"])
+    table = PendingTable(str(tmp_path / "pending.json"), ttl=60, max_size=10)
+    table.add(1, -100, "⏰ #N1")
+    clock["now"] += 30
+    table.add(2, -100, "⏰ #N2")
+    table.add(1, -100, "⏰ #N1 modifié")  # La date d'ajout est conservée
+    clock["now"] += 40
+    assert table.expire() == 1
+    assert 1 not in table and 2 in table
+    assert table.stats()["expired"] == 1
+    assert writer.flush(5)
+
+
+def test_oldest_entries_are_evicted_beyond_the_cap(tmp_path):
+    table = PendingTable(str(tmp_path / "pending.json"), ttl=3600, max_size=3)
+    for message_id in range(1, 6):
+        table.add(message_id, -100, f"⏰ #N{message_id}")
+    assert len(table) == 3 and 1 not in table and 2 not in table
+    assert table.stats()["evicted"] == 2
+    assert table.pop(4) == "⏰ #N4"
+    assert writer.flush(5)
+
+    reloaded = PendingTable(str(tmp_path / "pending.json"), ttl=3600, max_size=3)
+    assert reloaded.ids_by_chat() == {-100: [3, 5]}
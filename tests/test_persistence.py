@@ -0,0 +1,24 @@
+import threading
+import time
+
+from persistence import BackgroundWriter
+
+
+def test_read_sees_a_write_that_left_the_queue(tmp_path):
+    writer, started = BackgroundWriter(), threading.Event()
+    path = tmp_path / "state.bin"
+    path.write_bytes(b"old")
+
+    def slow():
+        started.set()
+        time.sleep(0.2)
+        return b"new"
+
+    writer.write_bytes(path, slow)
+    assert started.wait(5)
+    # Plus en file, pas encore sur disque: la lecture attend la fin de l'écriture
+    assert writer.read_bytes(path) == b"new"
+    writer.append_bytes(path, b"+")
+    assert writer.read_bytes(path) == b"new+"
+    assert writer.flush(5)
+    assert path.read_bytes() == b"new+"
@@ -0,0 +1,54 @@
+import hashlib
+
+import yaml
+
+from persistence import writer
+from yaml_manager import LEGACY_CHANNEL, YAMLDataManager
+
+
+def test_legacy_dedup_history_is_migrated(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data = tmp_path / "data"
+    data.mkdir()
+    old = "#N120. ✅8(K♠️5♥️3♦️) - 6(A♣️5♠️) #T14"
+    (data / "message_log.yaml").write_text(yaml.dump([
+        {"message_hash": hashlib.sha256(f"-100:{old}".encode()).hexdigest(),
+         "channel_id": -100, "content": old, "processed_at": "2026-01-01T00:00:00"},
+    ], allow_unicode=True), encoding="utf-8")
+    recent = "#N121. 2(10♠️2♥️) - ✅9(9♣️Q♠️) #T11"
+    (data / "message_log.log").write_text(
+        hashlib.sha256(f"-100:{recent}".encode()).hexdigest() + "\t-100\t2026-01-01T00:01:00\n", encoding="utf-8")
+
+    manager = YAMLDataManager()
+    # Anciennes entrées sans message_id: reconnues par numéro de jeu ou par empreinte sha256
+    assert manager.is_message_processed(old, -100, 501, 120)
+    assert manager.is_message_processed(recent, -100, 502)
+    assert not manager.is_message_processed("#N122. 1(A♠️) - 2(2♠️) #T3", -100, 503, 122)
+    assert not (data / "message_log.yaml").exists() and (data / "message_log.yaml.migrated").exists()
+    assert (data / "message_log.log.migrated").exists()
+
+    # Au redémarrage, l'historique migré est relu depuis le nouveau journal
+    writer.flush(5)
+    reloaded = YAMLDataManager()
+    assert reloaded.is_message_processed(recent, -100, 502)
+    assert reloaded.is_message_processed(old, -100, 501, 120)
+    assert any(chat_id == LEGACY_CHANNEL for chat_id, _ in reloaded.processed)
+    writer.flush(5)
+
+
+def test_catch_up_skips_messages_and_games_already_counted(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = YAMLDataManager()
+    text = "#N10. ✅8(K♠️5♥️3♦️) - 6(A♣️5♠️) #T14"
+    manager.mark_message_processed(text, -100, 500, 10)
+    assert manager.last_message_id(-100) == 500
+    # Même message relu au rattrapage, puis corrigé après comptage
+    assert manager.is_message_processed(text, -100, 500, 10)
+    assert manager.is_message_processed(text + " ", -100, 500, 10)
+    assert manager.changed_after_count == 1
+    # Même jeu republié sous un autre message
+    assert manager.is_message_processed(text, -100, 501, 10)
+    assert not manager.is_message_processed(text, -200, 501, 10)
+    writer.flush(5)
+    assert YAMLDataManager().last_message_id(-100) == 500
+    writer.flush(5)
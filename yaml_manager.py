@@ -1,61 +1,198 @@
-import os, yaml, json, hashlib
-from datetime import datetime, timedelta
+import os, re, yaml, hashlib, logging
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
+from game_bitmap import GameBitmap
+from persistence import writer
+from config_store import get_store
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_LOG_LIMIT = 1000  # Nombre de messages (chat_id, message_id) conservés pour l'anti-doublon
+LEGACY_CHANNEL = 0  # Canal fictif des empreintes sha256 migrées de message_log.log (canal inclus dans l'empreinte)
+_GAME_NUMBER_RE = re.compile(r"#N(\d+)")
 
 class YAMLDataManager:
     def __init__(self):
         self.data_dir = Path("data")
         self.data_dir.mkdir(exist_ok=True)
-        self.config_file = self.data_dir / "bot_config.yaml"
         self.predictions_file = self.data_dir / "predictions.yaml"
         self.auto_predictions_file = self.data_dir / "auto_predictions.yaml"
-        self.message_log_file = self.data_dir / "message_log.yaml"
+        self.message_journal_file = self.data_dir / "processed_messages.log"
+        # Anciens formats, migrés une fois puis renommés en .migrated
+        self.legacy_yaml_log_file = self.data_dir / "message_log.yaml"
+        self.legacy_journal_file = self.data_dir / "message_log.log"
         self._init_files()
+        self._load_message_index()
 
     def _init_files(self):
-        defaults = {self.config_file: {}, self.predictions_file: [], self.auto_predictions_file: {}, self.message_log_file: []}
+        defaults = {self.predictions_file: [], self.auto_predictions_file: {}}
         for file_path, default_content in defaults.items():
             if not file_path.exists():
                 self._save_yaml(file_path, default_content)
 
     def _load_yaml(self, file_path: Path) -> Any:
         try:
-            return yaml.safe_load(file_path.read_text(encoding="utf-8")) or {} if file_path.exists() else {}
+            text = writer.read_text(file_path)
+            return yaml.safe_load(text) or {} if text is not None else {}
         except Exception as e:
-            print(f"❌ Erreur chargement {file_path} : {e}")
+            logger.error("❌ Erreur chargement %s : %s", file_path, e)
             return {}
 
     def _save_yaml(self, file_path: Path, data: Any):
+        """Sérialise puis confie l'écriture (atomique) au thread de persistance."""
         try:
-            file_path.write_text(yaml.dump(data, allow_unicode=True, default_flow_style=False, indent=2), encoding="utf-8")
+            writer.write_text(file_path, yaml.dump(data, allow_unicode=True, default_flow_style=False, indent=2))
         except Exception as e:
-            print(f"❌ Erreur sauvegarde {file_path} : {e}")
+            logger.error("❌ Erreur sauvegarde %s : %s", file_path, e)
 
     def set_config(self, key: str, value: Any):
-        cfg = self._load_yaml(self.config_file)
-        cfg[key] = {"value": value, "updated_at": datetime.now().isoformat()}
-        self._save_yaml(self.config_file, cfg)
+        get_store().set(key, value)
 
     def get_config(self, key: str, default=None):
-        cfg = self._load_yaml(self.config_file)
-        return cfg.get(key, {}).get("value", default)
-
-    def mark_message_processed(self, content: str, channel_id: int):
-        log = self._load_yaml(self.message_log_file)
-        if not isinstance(log, list): log = []
-        h = hashlib.sha256(f"{channel_id}:{content}".encode()).hexdigest()
-        if any(m.get("message_hash") == h for m in log): return
-        log.append({"message_hash": h, "channel_id": channel_id, "content": content, "processed_at": datetime.now().isoformat()})
-        if len(log) > 1000: log = log[-1000:]
-        self._save_yaml(self.message_log_file, log)
-
-    def is_message_processed(self, content: str, channel_id: int) -> bool:
-        log = self._load_yaml(self.message_log_file)
-        if not isinstance(log, list): return False
-        h = hashlib.sha256(f"{channel_id}:{content}".encode()).hexdigest()
-        return any(m.get("message_hash") == h for m in log)
-
-yaml_manager = YAMLDataManager()
-def init_database(): return yaml_manager
+        return get_store().get(key, default)
+
+    # ---------- ANTI-DOUBLON ----------
+    # Clé = (chat_id, message_id) avec une petite empreinte du contenu pour repérer les
+    # corrections, plus une bitmap des numéros de jeu par canal (GameBitmap, mémoire fixe).
+    # Index en mémoire chargé une seule fois, persisté dans un journal en ajout seul
+    # (chat_id, message_id, numéro de jeu, empreinte) compacté de temps en temps.
+
+    def _load_message_index(self):
+        # (chat_id, message_id) -> (empreinte, numéro de jeu)
+        self.processed: Dict[Tuple[int, Any], Tuple[str, Optional[int]]] = {}
+        self.game_bitmaps: Dict[int, GameBitmap] = {}
+        self.checkpoints: Dict[int, int] = {}  # Plus haut message_id traité par canal
+        self.changed_after_count = 0  # Messages modifiés après avoir été comptés
+        self.has_legacy_hashes = False
+        self._journal_lines = 0
+        migrated = self._load_legacy_logs()
+        journal = writer.read_text(self.message_journal_file)
+        if journal:
+            for line in journal.splitlines():
+                parts = line.split("\t")
+                if len(parts) != 4:
+                    continue
+                chat_id, message_id, game_number, fp = parts
+                self._remember(int(chat_id), int(message_id) if message_id != "-" else fp,
+                               int(game_number) if game_number != "-" else None, fp)
+                self._journal_lines += 1
+        if migrated:
+            self._compact_message_journal()
+            # Le journal doit être sur disque avant de renommer les anciens fichiers
+            writer.flush()
+            for path in migrated:
+                os.replace(path, path.with_name(path.name + ".migrated"))
+            logger.info("📦 Anti-doublon migré depuis %s", ", ".join(path.name for path in migrated))
+
+    def _load_legacy_logs(self) -> List[Path]:
+        """
+        Charge l'historique des anciens formats: message_log.yaml (contenu complet, converti en
+        empreinte + numéro de jeu) puis message_log.log (empreintes sha256 "canal:contenu",
+        gardées sous LEGACY_CHANNEL). Retourne les fichiers lus.
+        """
+        migrated = []
+        if self.legacy_yaml_log_file.exists():
+            log = self._load_yaml(self.legacy_yaml_log_file)
+            for m in log if isinstance(log, list) else []:
+                content, channel_id = m.get("content"), m.get("channel_id")
+                if content is None or channel_id is None:
+                    continue
+                fp = self._fingerprint(content)
+                match = _GAME_NUMBER_RE.search(content)
+                self._remember(int(channel_id), fp, int(match.group(1)) if match else None, fp)
+            migrated.append(self.legacy_yaml_log_file)
+        legacy = writer.read_text(self.legacy_journal_file)
+        if legacy is not None:
+            for line in legacy.splitlines():
+                h = line.split("\t", 1)[0]
+                if h:
+                    self._remember(LEGACY_CHANNEL, h, None, h)
+            migrated.append(self.legacy_journal_file)
+        return migrated
+
+    def _remember(self, channel_id: int, message_id: Any, game_number: Optional[int], fp: str):
+        self.processed[(channel_id, message_id)] = (fp, game_number)
+        if channel_id == LEGACY_CHANNEL:
+            self.has_legacy_hashes = True
+        if len(self.processed) > MESSAGE_LOG_LIMIT:
+            del self.processed[next(iter(self.processed))]
+        if game_number is not None:
+            self.game_bitmap(channel_id).add(game_number)
+        if isinstance(message_id, int) and message_id > self.checkpoints.get(channel_id, 0):
+            self.checkpoints[channel_id] = message_id
+
+    def last_message_id(self, channel_id: int) -> Optional[int]:
+        """Plus haut message_id traité pour un canal (point de reprise), None si aucun."""
+        return self.checkpoints.get(channel_id)
+
+    def game_bitmap(self, channel_id: int) -> GameBitmap:
+        bitmap = self.game_bitmaps.get(channel_id)
+        if bitmap is None:
+            bitmap = self.game_bitmaps[channel_id] = GameBitmap()
+        return bitmap
+
+    def _compact_message_journal(self):
+        """Réécrit le journal avec les seules entrées encore indexées (écriture atomique en arrière-plan)."""
+        writer.write_text(self.message_journal_file, "".join(
+            f"{chat_id}\t{message_id if isinstance(message_id, int) else '-'}\t"
+            f"{game_number if game_number is not None else '-'}\t{fp}\n"
+            for (chat_id, message_id), (fp, game_number) in self.processed.items()
+        ))
+        self._journal_lines = len(self.processed)
+
+    @staticmethod
+    def _fingerprint(content: str) -> str:
+        """Empreinte courte (8 octets) du contenu, pour détecter une vraie modification."""
+        return hashlib.blake2b(content.encode(), digest_size=8).hexdigest()
+
+    @staticmethod
+    def _legacy_hash(content: str, channel_id: int) -> str:
+        """Empreinte de l'ancien journal message_log.log."""
+        return hashlib.sha256(f"{channel_id}:{content}".encode()).hexdigest()
+
+    def mark_message_processed(self, content: str, channel_id: int, message_id: Optional[int] = None,
+                               game_number: Optional[int] = None):
+        fp = self._fingerprint(content)
+        key = message_id if message_id is not None else fp
+        if (channel_id, key) in self.processed: return
+        self._remember(channel_id, key, game_number, fp)
+        writer.append_text(
+            self.message_journal_file,
+            f"{channel_id}\t{message_id if message_id is not None else '-'}\t"
+            f"{game_number if game_number is not None else '-'}\t{fp}\n"
+        )
+        self._journal_lines += 1
+        if self._journal_lines > 2 * MESSAGE_LOG_LIMIT:
+            self._compact_message_journal()
+
+    def is_message_processed(self, content: str, channel_id: int, message_id: Optional[int] = None,
+                             game_number: Optional[int] = None) -> bool:
+        fp = self._fingerprint(content)
+        known = self.processed.get((channel_id, message_id if message_id is not None else fp))
+        if known is not None:
+            if known[0] != fp:
+                # Message corrigé après comptage: on ne le compte pas une seconde fois
+                self.changed_after_count += 1
+                logger.info("✏️ Message %s du canal %s modifié après comptage, ignoré", message_id, channel_id)
+            return True
+        if self.has_legacy_hashes and (LEGACY_CHANNEL, self._legacy_hash(content, channel_id)) in self.processed:
+            return True
+        bitmap = self.game_bitmaps.get(channel_id)
+        return game_number is not None and bitmap is not None and game_number in bitmap
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Attend que les écritures en file (journal anti-doublon, YAML) soient sur disque."""
+        return writer.flush(timeout)
+
+yaml_manager: Optional[YAMLDataManager] = None
+
+def init_database():
+    """Stockage choisi par DATA_BACKEND: "yaml" (défaut) ou "sqlite" (migration YAML automatique)."""
+    global yaml_manager
+    if os.getenv("DATA_BACKEND", "yaml").lower() == "sqlite":
+        from sqlite_manager import SQLiteDataManager
+        return SQLiteDataManager()
+    if yaml_manager is None:
+        yaml_manager = YAMLDataManager()
+    return yaml_manager
       